@@ -0,0 +1,244 @@
+"""Async variant of the task JSON API, served under /api/v2/tasks.
+
+Runs on Quart with SQLAlchemy's asyncio engine (aiomysql for MySQL,
+aiosqlite for SQLite), so a worker keeps serving other requests while it
+waits on the database. It shares the Task model, validation and paging
+helpers with app.py and is served separately by an ASGI server, which also
+streams task changes to browsers at /api/tasks/events (see task_events.py):
+
+    uvicorn --factory async_api:create_async_app --host 0.0.0.0 --port 5001 --workers 4
+"""
+import os
+
+from quart import Blueprint, Quart, Response, current_app, jsonify, request, url_for
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app import (Task, load_config, parse_task_list_args, task_page_query,
+                 task_page_result, toggled_completed, validate_task_changes)
+from database import build_engine_options, is_memory_sqlite
+from task_events import EventBroker
+
+# Async driver used in place of each sync driver
+ASYNC_DRIVERS = {
+    'mysql': 'mysql+aiomysql',
+    'mysql+pymysql': 'mysql+aiomysql',
+    'sqlite': 'sqlite+aiosqlite',
+    'sqlite+pysqlite': 'sqlite+aiosqlite',
+}
+
+
+def async_database_uri(uri, instance_path):
+    """Map a sync database URI onto its asyncio driver.
+
+    Relative SQLite paths resolve inside the instance folder, as
+    Flask-SQLAlchemy does for the sync app, so both open the same file.
+    """
+    scheme, separator, rest = uri.partition('://')
+    if scheme.startswith('sqlite') and rest.startswith('/') and \
+            not is_memory_sqlite(uri):
+        path = rest[1:]
+        if path and not os.path.isabs(path):
+            rest = '/' + os.path.join(instance_path, path)
+    return ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
+
+
+def async_engine_options(config):
+    """Pool settings from the DB_POOL_* config for the asyncio engine"""
+    # The single-writer SQLite pool is the sync app's; this engine reads and writes
+    options = build_engine_options(dict(config, SQLITE_READ_WRITE_SPLIT=False))
+    # The instrumented pool is sync-only; asyncio engines use their adapted pool
+    options.pop('poolclass', None)
+    if is_memory_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        options['poolclass'] = StaticPool
+    return options
+
+
+bp = Blueprint('tasks_v2', __name__, url_prefix='/api/v2/tasks')
+
+
+def new_session():
+    return current_app.extensions['async_session']()
+
+
+def not_found():
+    return jsonify({'error': 'Task not found'}), 404
+
+
+@bp.route('', methods=['GET'])
+async def list_tasks():
+    try:
+        options = parse_task_list_args(request.args, current_app.config)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    async with new_session() as session:
+        rows = (await session.execute(task_page_query(options))).mappings().all()
+    tasks, next_cursor = task_page_result(rows, options)
+    response = jsonify(tasks)
+    if next_cursor:
+        next_args = request.args.to_dict()
+        next_args['after'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        next_url = url_for('tasks_v2.list_tasks', **next_args)
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
+
+
+@bp.route('/<int:task_id>', methods=['GET'])
+async def get_task(task_id):
+    async with new_session() as session:
+        task = await session.get(Task, task_id)
+        if task is None:
+            return not_found()
+        return jsonify(task.to_dict())
+
+
+@bp.route('', methods=['POST'])
+async def create_task():
+    try:
+        changes = validate_task_changes(await request.get_json(silent=True),
+                                        partial=False)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    async with new_session() as session:
+        task = Task(**changes)
+        session.add(task)
+        await session.commit()
+        return jsonify(task.to_dict()), 201
+
+
+@bp.route('/<int:task_id>', methods=['PATCH'])
+async def update_task(task_id):
+    try:
+        changes = validate_task_changes(await request.get_json(silent=True),
+                                        partial=True)
+        if not changes:
+            raise ValueError('No fields to update')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    async with new_session() as session:
+        task = await session.get(Task, task_id)
+        if task is None:
+            return not_found()
+        for name, value in changes.items():
+            setattr(task, name, value)
+        await session.commit()
+        return jsonify(task.to_dict())
+
+
+@bp.route('/<int:task_id>', methods=['DELETE'])
+async def delete_task(task_id):
+    async with new_session() as session:
+        task = await session.get(Task, task_id)
+        if task is None:
+            return not_found()
+        await session.delete(task)
+        await session.commit()
+        return jsonify({'status': 'success'})
+
+
+@bp.route('/<int:task_id>/toggle', methods=['POST'])
+async def toggle_task(task_id):
+    statement = update(Task).where(Task.id == task_id) \
+        .values(completed=toggled_completed()) \
+        .execution_options(synchronize_session=False)
+    async with new_session() as session:
+        if session.bind.dialect.update_returning:
+            result = await session.execute(statement.returning(Task.completed))
+            completed = result.scalar()
+        elif (await session.execute(statement)).rowcount:
+            completed = (await session.execute(
+                select(Task.completed).where(Task.id == task_id))).scalar()
+        else:
+            completed = None
+        await session.commit()
+    if completed is None:
+        return not_found()
+    return jsonify({'status': 'success', 'completed': completed})
+
+
+events_bp = Blueprint('task_events', __name__)
+
+
+@events_bp.route('/api/tasks/events', methods=['GET'])
+async def task_events():
+    # EventSource resends the last ID as a header on reconnect; the query
+    # parameter lets a page pick up from the ID it was rendered at
+    last_event_id = request.headers.get('Last-Event-ID') or \
+        request.args.get('last_event_id')
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+            if last_event_id < 0:
+                raise ValueError
+        except ValueError:
+            return jsonify(
+                {'error': 'Last-Event-ID must be a non-negative integer'}), 400
+
+    response = Response(current_app.extensions['event_broker'].stream(last_event_id),
+                        mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stops nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['Access-Control-Allow-Origin'] = \
+        current_app.config['EVENTS_ALLOW_ORIGIN']
+    # Streams stay open until the client leaves
+    response.timeout = None
+    return response
+
+
+health_bp = Blueprint('health', __name__)
+
+
+@health_bp.route('/healthz', methods=['GET'])
+async def healthz():
+    """Liveness: the event loop is serving requests (no database access)"""
+    return jsonify({'status': 'ok'})
+
+
+def create_async_app(config=None):
+    """Application factory for the async API.
+
+    Uses the same environment-derived settings as app.create_app();
+    ASYNC_DATABASE_URL overrides the derived async database URI.
+    """
+    app = Quart(__name__)
+    app.config.from_mapping(load_config())
+    if config:
+        app.config.from_mapping(config)
+    app.config.setdefault('ASYNC_DATABASE_URI',
+                          os.environ.get('ASYNC_DATABASE_URL')
+                          or async_database_uri(app.config['SQLALCHEMY_DATABASE_URI'],
+                                                app.instance_path))
+
+    @app.before_serving
+    async def open_engine():
+        engine = create_async_engine(app.config['ASYNC_DATABASE_URI'],
+                                     **async_engine_options(app.config))
+        app.extensions['async_engine'] = engine
+        # Task writes through these sessions trim the event log too (see app.py)
+        app.extensions['async_session'] = async_sessionmaker(
+            engine, expire_on_commit=False,
+            info={'events_log_size': app.config['EVENTS_LOG_SIZE']})
+        app.extensions['event_broker'] = EventBroker(
+            app.extensions['async_session'],
+            poll_interval=app.config['EVENTS_POLL_INTERVAL'],
+            heartbeat=app.config['EVENTS_HEARTBEAT'],
+            queue_size=app.config['EVENTS_QUEUE_SIZE'],
+            batch_limit=app.config['EVENTS_BATCH_LIMIT'],
+            gap_timeout=app.config['EVENTS_GAP_TIMEOUT'],
+            replay_window=app.config['EVENTS_REPLAY_WINDOW'])
+
+    @app.after_serving
+    async def close_engine():
+        await app.extensions.pop('event_broker').close()
+        await app.extensions.pop('async_engine').dispose()
+
+    app.register_blueprint(bp)
+    app.register_blueprint(events_bp)
+    app.register_blueprint(health_bp)
+    return app
@@ -0,0 +1,105 @@
+"""Measure `flask tasks archive` and what it costs concurrent requests.
+
+Seeds a SQLite database with --rows tasks, --completed-ratio of them
+completed 90 days ago, and serves it with gunicorn. Clients run a mix of
+toggles on pending tasks, pending-task lists and index pages, first alone
+and then while the archive job moves the completed tasks in batches of
+--batch-size. Reports request latency in both phases, archive throughput,
+and the list and index latency on the slimmed table afterwards.
+
+    python benchmarks/bench_archive.py --rows 200000 --batch-size 500
+"""
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from loadgen import (ROOT, free_port, gunicorn_command, run_load, running_server,
+                     seed_sqlite)
+
+
+def mixed_requests(pending_ids):
+    def make_request(worker, iteration):
+        slot = (worker * 31 + iteration) % 10
+        if slot < 2:
+            task_id = pending_ids[(worker * 7919 + iteration) % len(pending_ids)]
+            return 'POST', f'/toggle/{task_id}', None
+        if slot < 6:
+            return 'GET', '/api/tasks?completed=false&limit=20', None
+        return 'GET', '/?page=2', None
+    return make_request
+
+
+def reads(worker, iteration):
+    if iteration % 2:
+        return 'GET', '/api/tasks?completed=false&limit=20', None
+    return 'GET', '/?page=2', None
+
+
+def report(label, result):
+    print(f"{label:<26} {result['rps']:>9.1f} req/s  p50 {result['p50_ms']:>7.2f}ms  "
+          f"p99 {result['p99_ms']:>8.2f}ms  errors {result['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--completed-ratio', type=float, default=0.9)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    seed_sqlite(path, args.rows)
+    connection = sqlite3.connect(path)
+    every = max(1, round(1 / max(1 - args.completed_ratio, 1e-9)))
+    with connection:
+        connection.execute("UPDATE task SET completed = (id % ?) != 0, "
+                           "created_at = datetime('now', '-90 days')", (every,))
+        connection.execute('DELETE FROM task_event')
+    pending_ids = [row[0] for row in connection.execute(
+        'SELECT id FROM task WHERE completed = 0 ORDER BY id')]
+    connection.close()
+
+    env = {'DATABASE_URL': f'sqlite:///{path}', 'CACHE_BACKEND': 'none',
+           'INDEX_CACHE_TTL': '0', 'SLOW_QUERY_MS': '0'}
+    archive_env = dict(os.environ, FLASK_APP='app.py', **env)
+    port = free_port()
+    command = gunicorn_command(port, args.workers, args.threads)
+    with running_server(command, port, env) as url:
+        report('reads before', run_load(url, reads, args.concurrency, args.duration))
+        report('mixed, no archiving', run_load(url, mixed_requests(pending_ids),
+                                               args.concurrency, args.duration))
+
+        archive = {}
+
+        def run_archive():
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-m', 'flask', 'tasks', 'archive',
+                            '--older-than', '30', '--batch-size', str(args.batch_size)],
+                           cwd=ROOT, env=archive_env, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            archive['seconds'] = time.perf_counter() - start
+
+        thread = threading.Thread(target=run_archive)
+        thread.start()
+        report('mixed, while archiving', run_load(url, mixed_requests(pending_ids),
+                                                  args.concurrency, args.duration))
+        thread.join()
+        connection = sqlite3.connect(path)
+        archived = connection.execute('SELECT COUNT(*) FROM task_archive').fetchone()[0]
+        connection.close()
+        print(f"archived {archived:,} tasks in {archive['seconds']:.1f}s "
+              f"({archived / archive['seconds']:,.0f} rows/s, incl. startup)")
+        report('reads after', run_load(url, reads, args.concurrency, args.duration))
+
+
+if __name__ == '__main__':
+    main()
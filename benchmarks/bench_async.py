@@ -0,0 +1,77 @@
+"""Compare the sync /api/tasks on gunicorn with the async /api/v2/tasks on uvicorn.
+
+Seeds a temporary SQLite database (or uses DATABASE_URL), then drives both
+servers with the same read-heavy mix at each client concurrency level using
+asyncio connections, so hundreds of clients fit in one load process.
+
+    python benchmarks/bench_async.py --concurrency 100 500 1000 --workers 2
+"""
+import argparse
+import json
+import os
+import resource
+import tempfile
+
+from loadgen import (free_port, gunicorn_command, run_load_async, running_server,
+                     seed_sqlite, uvicorn_command)
+
+
+def api_mix(prefix):
+    def make_request(worker, iteration):
+        if iteration % 10 == 9:
+            body = json.dumps({'title': f'Bench {worker}-{iteration}'}).encode()
+            return 'POST', prefix, body
+        if iteration % 2:
+            return 'GET', f'{prefix}/{iteration % 500 + 1}', None
+        return 'GET', f'{prefix}?limit=20', None
+    return make_request
+
+
+def raise_file_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+def report(label, concurrency, result):
+    print(f"{label:<28} c={concurrency:<5} {result['rps']:>9.1f} req/s  "
+          f"p50 {result['p50_ms']:>8.2f}ms  p99 {result['p99_ms']:>9.2f}ms  "
+          f"errors {result['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0)
+    args = parser.parse_args()
+    # Clients and the servers they start both need one descriptor per connection
+    raise_file_limit(max(args.concurrency) * 2 + 256)
+
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        seed_sqlite(path, args.rows)
+        database_url = f'sqlite:///{path}'
+    env = {'DATABASE_URL': database_url, 'CACHE_BACKEND': 'none'}
+
+    servers = [
+        (f'gunicorn {args.workers}w x {args.threads}t',
+         lambda port: gunicorn_command(port, args.workers, args.threads), '/api/tasks'),
+        (f'uvicorn {args.workers}w (async)',
+         lambda port: uvicorn_command(port, args.workers), '/api/v2/tasks'),
+    ]
+    for label, command, prefix in servers:
+        port = free_port()
+        with running_server(command(port), port, env,
+                            ready_path=f'{prefix}?limit=1') as url:
+            for concurrency in args.concurrency:
+                report(label, concurrency,
+                       run_load_async(url, api_mix(prefix), concurrency, args.duration))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Compare bulk task endpoints with the single-row endpoints.
+
+Runs entirely in-process against a temporary SQLite file (or DATABASE_URL
+if set) through the Flask test client and prints rows/sec for each path.
+
+    python benchmarks/bench_bulk.py --rows 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def timed(label, rows, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {rows:>8} rows {elapsed:>8.3f}s {rows / elapsed:>12.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000, help='rows per operation')
+    parser.add_argument('--chunk-size', type=int, default=500,
+                        help='rows per transaction')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    os.environ.setdefault('DATABASE_URL',
+                          f"sqlite:///{os.path.join(tmpdir, 'bench.db')}")
+    # Thousands of single-row requests from one client
+    os.environ.setdefault('RATE_LIMIT_BACKEND', 'none')
+    from app import app, db, Task
+
+    app.config['BULK_CHUNK_SIZE'] = args.chunk_size
+    client = app.test_client(use_cookies=False)
+    items = [{'title': f'Task {i}', 'description': 'Benchmark task'}
+             for i in range(args.rows)]
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        timed('single POST /api/tasks', args.rows,
+              lambda: [client.post('/api/tasks', json=item) for item in items])
+        ids = [task_id for (task_id,) in db.session.query(Task.id)]
+        timed('single POST /toggle/<id>', args.rows,
+              lambda: [client.post(f'/toggle/{task_id}') for task_id in ids])
+        timed('single POST /delete/<id>', args.rows,
+              lambda: [client.post(f'/delete/{task_id}') for task_id in ids])
+
+        timed('bulk POST /api/tasks/bulk', args.rows,
+              lambda: client.post('/api/tasks/bulk', json=items))
+        ids = [task_id for (task_id,) in db.session.query(Task.id)]
+        timed('bulk PATCH (same values)', args.rows,
+              lambda: client.patch('/api/tasks/bulk',
+                                   json=[{'id': i, 'completed': True} for i in ids]))
+        timed('bulk PATCH (distinct values)', args.rows,
+              lambda: client.patch('/api/tasks/bulk',
+                                   json=[{'id': i, 'title': f'Renamed {i}'}
+                                         for i in ids]))
+        timed('bulk DELETE /api/tasks/bulk', args.rows,
+              lambda: client.delete('/api/tasks/bulk', json=ids))
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
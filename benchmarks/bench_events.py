@@ -0,0 +1,101 @@
+"""Measure /api/tasks/events fan-out to many idle Server-Sent Events clients.
+
+Starts one uvicorn worker on a temporary SQLite database, opens each
+--connections count of idle SSE streams, then creates tasks through
+/api/v2/tasks and times how long each change takes to reach every stream.
+Server memory per idle connection comes from /proc (Linux only).
+
+    python benchmarks/bench_events.py --connections 100 1000 5000 --writes 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from bench_async import raise_file_limit
+from loadgen import (free_port, percentile, process_tree_rss, seed_sqlite, start_server,
+                     stop_server, uvicorn_command)
+
+
+async def open_stream(host, port):
+    """An SSE connection that has received its ready event"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f'GET /api/tasks/events HTTP/1.1\r\nHost: {host}:{port}\r\n\r\n'
+                 .encode())
+    await writer.drain()
+    await reader.readuntil(b'event: ready\n')
+    return reader, writer
+
+
+async def wait_for_event(reader, marker):
+    while marker not in await reader.readline():
+        pass
+    return time.perf_counter()
+
+
+async def post_task(host, port, title):
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps({'title': title}).encode()
+    writer.write(f'POST /api/v2/tasks HTTP/1.1\r\nHost: {host}:{port}\r\n'
+                 f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n'
+                 f'Connection: close\r\n\r\n'.encode() + body)
+    await writer.drain()
+    await reader.read()
+    writer.close()
+
+
+async def measure(port, connections, writes, pid):
+    host = '127.0.0.1'
+    baseline = process_tree_rss(pid)
+    streams = []
+    # Opened in batches so the listen backlog does not overflow
+    for start in range(0, connections, 200):
+        batch = range(start, min(connections, start + 200))
+        streams += await asyncio.gather(*(open_stream(host, port) for _ in batch))
+    per_connection = (process_tree_rss(pid) - baseline) / connections
+
+    delays = []
+    for i in range(writes):
+        title = f'Fan-out {connections}-{i}'
+        waiting = [asyncio.ensure_future(wait_for_event(reader, title.encode()))
+                   for reader, _ in streams]
+        start = time.perf_counter()
+        await post_task(host, port, title)
+        received = await asyncio.wait_for(asyncio.gather(*waiting), 60)
+        delays.append((max(received) - start) * 1000)
+    for _, writer in streams:
+        writer.close()
+    delays.sort()
+    return per_connection, percentile(delays, 50), percentile(delays, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connections', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--writes', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=1000)
+    args = parser.parse_args()
+    raise_file_limit(max(args.connections) * 2 + 256)
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    seed_sqlite(path, args.rows)
+    env = {'DATABASE_URL': f'sqlite:///{path}'}
+    print(f"{'connections':>11} {'KiB/conn':>9} {'p50 ms':>8} {'p99 ms':>8}  "
+          "(change to all streams)")
+    for connections in args.connections:
+        port = free_port()
+        process = start_server(uvicorn_command(port, 1), port, env,
+                               ready_path='/api/v2/tasks?limit=1')
+        try:
+            per_connection, p50, p99 = asyncio.run(
+                measure(port, connections, args.writes, process.pid))
+        finally:
+            stop_server(process)
+        print(f'{connections:>11} {per_connection / 1024:>9.1f} {p50:>8.1f} '
+              f'{p99:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Measure `flask tasks import` throughput against inserting through the triggers.
+
+Writes a CSV of --rows generated tasks, then imports it into fresh SQLite
+databases with each --methods value: auto (one transaction, triggers
+and indexes applied in bulk) and executemany (per-batch commits with the
+per-row triggers), and reports rows per second for each.
+
+    python benchmarks/bench_import.py --rows 1000000
+"""
+import argparse
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from loadgen import ROOT
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['title', 'description', 'completed', 'created_at'])
+        for i in range(rows):
+            writer.writerow([f'Task {i}', f'Imported task {i}, with "quotes"',
+                             'true' if i % 3 == 0 else 'false',
+                             f'2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}T09:30:00Z'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--methods', nargs='+', default=['auto', 'executemany'])
+    parser.add_argument('--batch-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    source = os.path.join(directory, 'tasks.csv')
+    write_csv(source, args.rows)
+    for method in args.methods:
+        path = os.path.join(directory, f'{method}.db')
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{path}',
+                   FLASK_APP='app.py', SLOW_QUERY_MS='0')
+        subprocess.run([sys.executable, '-m', 'flask', 'init-db', '--no-sample-data'],
+                       cwd=ROOT, env=env, check=True)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'flask', 'tasks', 'import', source,
+                        '--method', method, '--batch-size', str(args.batch_size)],
+                       cwd=ROOT, env=env, check=True, stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        print(f'{method:<12} {args.rows / elapsed:>10,.0f} rows/s  '
+              f'({elapsed:.1f}s, incl. startup)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Compare ways of turning task rows into a JSON response body.
+
+Loads every task from a seeded SQLite file and times three pipelines:
+ORM objects + Task.to_dict + the stdlib encoder (the old path), column
+rows + serialize_task_row + the stdlib encoder, and column rows + the
+orjson provider. Each reports rows per second plus the time spent loading
+rows and encoding them (best of several rounds), and the bodies are checked
+to be byte-identical.
+
+    python benchmarks/bench_json.py --rows 50000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from loadgen import seed_sqlite
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def best_times(load, encode, rounds):
+    """Fastest (load seconds, encode seconds) over the rounds, and the body"""
+    best_load = best_encode = float('inf')
+    body = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        data = load()
+        loaded = time.perf_counter()
+        body = encode(data)
+        best_load = min(best_load, loaded - start)
+        best_encode = min(best_encode, time.perf_counter() - loaded)
+    return best_load, best_encode, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    seed_sqlite(path, args.rows)
+    from flask.json.provider import DefaultJSONProvider
+    from sqlalchemy import select
+    from app import create_app, db, Task, TASK_FIELDS, serialize_task_row, task_columns
+    import json_provider
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+                      'SLOW_QUERY_MS': 0})
+    fields = list(TASK_FIELDS)
+
+    def orm_dicts():
+        db.session.expunge_all()
+        return [task.to_dict() for task in Task.query.order_by(Task.id)]
+
+    def row_dicts():
+        rows = db.session.execute(select(*task_columns()).order_by(Task.id)).mappings()
+        return [serialize_task_row(row, fields) for row in rows]
+
+    def encoder(provider):
+        return lambda data: provider.dumps(data, separators=(',', ':'))
+
+    stdlib = encoder(DefaultJSONProvider(app))
+    pipelines = [('ORM + to_dict + stdlib', orm_dicts, stdlib),
+                 ('column rows + stdlib', row_dicts, stdlib)]
+    if json_provider.orjson is not None:
+        pipelines.append(('column rows + orjson', row_dicts,
+                          encoder(json_provider.OrjsonProvider(app))))
+    else:
+        print('orjson is not installed; skipping the orjson pipeline')
+
+    bodies = {}
+    print(f"{'pipeline':<24} {'rows/s':>12} {'load ms':>9} {'encode ms':>10}")
+    with app.app_context():
+        for name, load, encode in pipelines:
+            load_s, encode_s, bodies[name] = best_times(load, encode, args.rounds)
+            print(f"{name:<24} {args.rows / (load_s + encode_s):>12,.0f} "
+                  f"{load_s * 1000:>9.1f} {encode_s * 1000:>10.1f}")
+    if len(set(bodies.values())) != 1:
+        sys.exit('Response bodies differ between pipelines')
+    print('All pipelines produced identical bodies')
+
+
+if __name__ == '__main__':
+    main()
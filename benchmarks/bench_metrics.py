@@ -0,0 +1,65 @@
+"""Measure the per-request overhead of the request and SQL metrics.
+
+Serves the same seeded SQLite file through two in-process apps, one with
+METRICS_ENABLED and one without, and reports the time per request of each
+and the difference. Runs alternate between the apps to even out noise.
+
+    python benchmarks/bench_metrics.py --requests 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from loadgen import seed_sqlite
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def time_requests(client, paths, requests):
+    start = time.perf_counter()
+    for i in range(requests):
+        client.get(paths[i % len(paths)])
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=2000, help='requests per round')
+    parser.add_argument('--rounds', type=int, default=9)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    seed_sqlite(path, args.rows)
+    from app import create_app
+
+    paths = ['/api/tasks?limit=20', '/api/tasks/1',
+             '/api/tasks?completed=true&limit=20']
+    apps = {}
+    for enabled in (False, True):
+        apps[enabled] = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+                                    'CACHE_BACKEND': 'none',
+                                    'METRICS_ENABLED': enabled,
+                                    'RATE_LIMIT_BACKEND': 'none'})
+    clients = {enabled: app.test_client(use_cookies=False)
+               for enabled, app in apps.items()}
+    for client in clients.values():
+        time_requests(client, paths, 200)  # warm up
+
+    best = {False: float('inf'), True: float('inf')}
+    for _ in range(args.rounds):
+        for enabled, client in clients.items():
+            best[enabled] = min(best[enabled],
+                                time_requests(client, paths, args.requests))
+
+    overhead = best[True] - best[False]
+    print(f"metrics off  {best[False] * 1e6:>8.1f} us/request")
+    print(f"metrics on   {best[True] * 1e6:>8.1f} us/request")
+    print(f"overhead     {overhead * 1e6:>8.1f} us/request "
+          f"({overhead / best[False]:.1%})")
+
+
+if __name__ == '__main__':
+    main()
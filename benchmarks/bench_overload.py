@@ -0,0 +1,105 @@
+"""Measure how well-behaved clients fare while one client floods the API.
+
+Serves a seeded SQLite database with gunicorn and runs --clients paced
+clients, each sending a request every --think-ms (mostly task lists, some
+toggles) under its own X-Client-Id. First they run alone, then beside an
+abusive client that posts new tasks at --abuser-rate requests per second
+whatever the answer, once with rate limiting and admission control off and
+once with them on. Reports the paced clients' latency and, for the abuser, how many
+requests were served and how many were refused.
+
+    python benchmarks/bench_overload.py --clients 8 --abuser-rate 400
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from loadgen import free_port, gunicorn_command, run_load, running_server, seed_sqlite
+
+
+def paced_clients(rows, think):
+    def make_request(worker, iteration):
+        time.sleep(think)
+        headers = {'X-Client-Id': f'client-{worker}'}
+        if iteration % 5 == 4:
+            task_id = (worker * 7919 + iteration) % rows + 1
+            return 'POST', f'/toggle/{task_id}', None, headers
+        return 'GET', '/api/tasks?completed=false&limit=20', None, headers
+    return make_request
+
+
+def abuser(rate, threads):
+    """Posts tasks at rate per second in all, ignoring refusals and catching up"""
+    interval = threads / rate
+    starts = {}
+
+    def make_request(worker, iteration):
+        start = starts.setdefault(worker, time.perf_counter())
+        delay = start + iteration * interval - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        body = json.dumps({'title': f'Flood {worker}-{iteration}'}).encode()
+        return 'POST', '/api/tasks', body, {'X-Client-Id': 'abuser'}
+    return make_request
+
+
+def flood(url, rate, threads, duration, results):
+    results.put(run_load(url, abuser(rate, threads), threads, duration))
+
+
+def report(label, result):
+    print(f"{label:<24} {result['rps']:>8.1f} req/s  p50 {result['p50_ms']:>7.2f}ms  "
+          f"p99 {result['p99_ms']:>8.2f}ms  errors {result['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--think-ms', type=float, default=50)
+    parser.add_argument('--abuser-rate', type=float, default=400)
+    parser.add_argument('--abuser-threads', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    seed_sqlite(path, args.rows)
+    base_env = {'DATABASE_URL': f'sqlite:///{path}',
+                'RATE_LIMIT_CLIENT_HEADER': 'X-Client-Id'}
+    scenarios = [
+        ('limits off', {'RATE_LIMIT_BACKEND': 'none',
+                        'ADMISSION_MAX_POOL_WAIT_MS': '0'}),
+        ('limits on', {'RATE_LIMIT_BACKEND': 'memory',
+                       'ADMISSION_MAX_POOL_WAIT_MS': '500'}),
+    ]
+    good = paced_clients(args.rows, args.think_ms / 1000)
+    for name, env in scenarios:
+        print(f'-- {name}')
+        port = free_port()
+        with running_server(gunicorn_command(port, args.workers, args.threads), port,
+                            dict(base_env, **env)) as url:
+            report('clients alone', run_load(url, good, args.clients, args.duration))
+            # A separate process, so the flood doesn't slow the paced clients'
+            # own threads
+            results = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=flood, args=(url, args.abuser_rate, args.abuser_threads,
+                                    args.duration, results))
+            process.start()
+            report('clients during flood',
+                   run_load(url, good, args.clients, args.duration))
+            flooded = results.get()
+            process.join()
+            served = flooded['requests'] - flooded['errors']
+            print(f"{'abuser':<24} {served:>8,} served  "
+                  f"{flooded['errors']:>8,} refused "
+                  f"(429/503)  p99 {flooded['p99_ms']:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
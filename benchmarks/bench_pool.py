@@ -0,0 +1,57 @@
+"""Measure API latency under concurrency at several connection pool sizes.
+
+Runs one gunicorn worker with as many threads as concurrent clients, so the
+pool is the only limit on parallel database work, and reports p99 latency
+with the pool's checkout wait for each DB_POOL_SIZE. Uses a temporary SQLite
+database unless DATABASE_URL points at MySQL.
+
+    python benchmarks/bench_pool.py --pool-sizes 1 2 4 8 --concurrency 32
+"""
+import argparse
+import json
+import os
+import tempfile
+import urllib.request
+
+from loadgen import free_port, gunicorn_command, run_load, running_server, seed_sqlite
+
+
+def api_mix(worker, iteration):
+    if iteration % 4 == 3:
+        body = json.dumps({'title': f'Bench {worker}-{iteration}'}).encode()
+        return 'POST', '/api/tasks', body
+    completed = 'true' if iteration % 2 else 'false'
+    return 'GET', f'/api/tasks?limit=20&completed={completed}', None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--pool-sizes', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=5.0)
+    args = parser.parse_args()
+
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        seed_sqlite(path, args.rows)
+        database_url = f'sqlite:///{path}'
+
+    for pool_size in args.pool_sizes:
+        env = {'DATABASE_URL': database_url, 'CACHE_BACKEND': 'none',
+               'DB_POOL_SIZE': str(pool_size), 'DB_MAX_OVERFLOW': '0'}
+        port = free_port()
+        command = gunicorn_command(port, workers=1, threads=args.concurrency)
+        with running_server(command, port, env) as url:
+            result = run_load(url, api_mix, args.concurrency, args.duration)
+            with urllib.request.urlopen(f'{url}/api/pool/stats') as response:
+                pool = json.load(response)
+        print(f"pool_size={pool_size:<3} {result['rps']:>8.1f} req/s  "
+              f"p50 {result['p50_ms']:>7.2f}ms  p99 {result['p99_ms']:>8.2f}ms  "
+              f"checkout wait p99 {pool['wait_seconds_p99'] * 1000:>7.2f}ms  "
+              f"timeouts {pool['timeouts']}  errors {result['errors']}")
+
+
+if __name__ == '__main__':
+    main()
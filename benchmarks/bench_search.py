@@ -0,0 +1,97 @@
+"""Measure /api/tasks/search latency as the task table grows.
+
+Seeds temporary SQLite databases of each size with titles and descriptions
+drawn from a Zipf-like vocabulary, then times rare, medium and common term
+searches through the Flask test client for FTS5 and the in-process index,
+with a LIKE '%term%' scan as the baseline.
+
+    python benchmarks/bench_search.py --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+VOCABULARY = [f'word{i}' for i in range(5000)]
+# Rank in VOCABULARY sets how often a word appears: word0 is the most common
+QUERIES = {'rare': 'word4000', 'medium': 'word200', 'common': 'word3'}
+
+
+def seed(path, rows, batch_size=20000):
+    from app import create_app, db, Task
+    from sqlalchemy import insert
+
+    rng = random.Random(42)
+    weights = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+                      'SLOW_QUERY_MS': 0})
+    with app.app_context():
+        db.create_all()
+        for start in range(0, rows, batch_size):
+            count = min(batch_size, rows - start)
+            words = rng.choices(VOCABULARY, weights, k=12 * count)
+            db.session.execute(insert(Task), [
+                {'title': ' '.join(words[12 * i:12 * i + 4]),
+                 'description': ' '.join(words[12 * i + 4:12 * i + 12])}
+                for i in range(count)
+            ])
+            db.session.commit()
+        db.engine.dispose()
+
+
+def time_search(client, url, repeat):
+    client.get(url)  # warm up, and build the in-process index
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.data
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    from app import create_app, db, Task
+
+    for rows in args.sizes:
+        path = os.path.join(tempfile.mkdtemp(), 'search.db')
+        seed(path, rows)
+        for backend in ('auto', 'memory'):
+            app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+                              'SEARCH_BACKEND': backend, 'CACHE_BACKEND': 'none',
+                              'RATE_LIMIT_BACKEND': 'none'})
+            client = app.test_client(use_cookies=False)
+            results = {
+                label: time_search(client,
+                                   f'/api/tasks/search?q={term}&limit={args.limit}',
+                                   args.repeat)
+                for label, term in QUERIES.items()}
+            label = 'fts5' if backend == 'auto' else 'memory'
+            print(f"{rows:>9} rows {label:<7} "
+                  + '  '.join(f"{name} {ms:>8.2f}ms" for name, ms in results.items()))
+
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+        with app.app_context():
+            start = time.perf_counter()
+            pattern = f"%{QUERIES['rare']}%"
+            db.session.query(Task).filter(Task.title.like(pattern)
+                                          | Task.description.like(pattern)) \
+                .limit(args.limit).all()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"{rows:>9} rows LIKE    rare {elapsed_ms:>8.2f}ms")
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
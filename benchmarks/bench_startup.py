@@ -0,0 +1,63 @@
+"""Measure cold-start time: importing the app plus serving the first request.
+
+Each run is a fresh interpreter. Fails with exit status 1 when the median
+exceeds --max-seconds, so it can guard against blocking work creeping back
+into import time (such as the old 3 second MySQL probe).
+
+    python benchmarks/bench_startup.py --runs 5 --max-seconds 1.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from loadgen import ROOT
+
+PROBE = '''
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+with app.app.app_context():
+    app.db.create_all()
+response = app.app.test_client().get('/api/tasks')
+assert response.status_code == 200, response.status_code
+done = time.perf_counter()
+print(json.dumps({'import': imported - start, 'first_request': done - imported,
+                  'total': done - start}))
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help='fail if the median import + first request exceeds this')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.pop('FORCE_SQLITE_TESTING', None)
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    env.setdefault('DATABASE_URL', f'sqlite:///{path}')
+
+    samples = []
+    for _ in range(args.runs):
+        result = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True)
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    medians = {key: statistics.median(s[key] for s in samples)
+               for key in ('import', 'first_request', 'total')}
+    print(f"import {medians['import'] * 1000:.1f}ms  "
+          f"first request {medians['first_request'] * 1000:.1f}ms  "
+          f"total {medians['total'] * 1000:.1f}ms  (median of {args.runs})")
+    if args.max_seconds is not None and medians['total'] > args.max_seconds:
+        print(f"FAIL: cold start exceeds {args.max_seconds}s")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
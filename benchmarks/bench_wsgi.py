@@ -0,0 +1,56 @@
+"""Compare request throughput of the dev server and gunicorn worker counts.
+
+Seeds a temporary SQLite database, then serves it with `python app.py`'s
+Werkzeug server and with gunicorn at each worker count, printing req/s and
+latency percentiles for the same mixed read workload.
+
+    python benchmarks/bench_wsgi.py --workers 1 2 4 --concurrency 16
+"""
+import argparse
+import os
+import tempfile
+
+from loadgen import (dev_server_command, free_port, gunicorn_command, run_load,
+                     running_server, seed_sqlite)
+
+
+def read_mix(worker, iteration):
+    paths = ('/api/tasks?limit=20', f'/api/tasks/{iteration % 500 + 1}', '/')
+    return 'GET', paths[iteration % len(paths)], None
+
+
+def report(label, result):
+    print(f"{label:<24} {result['rps']:>9.1f} req/s  p50 {result['p50_ms']:>7.2f}ms  "
+          f"p95 {result['p95_ms']:>7.2f}ms  p99 {result['p99_ms']:>7.2f}ms  "
+          f"errors {result['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    seed_sqlite(path, args.rows)
+    # Disable the read caches so every request reaches the database
+    env = {'DATABASE_URL': f'sqlite:///{path}', 'CACHE_BACKEND': 'none',
+           'INDEX_CACHE_TTL': '0'}
+
+    port = free_port()
+    with running_server(dev_server_command(port), port, env) as url:
+        report('dev server', run_load(url, read_mix, args.concurrency, args.duration))
+
+    for workers in args.workers:
+        port = free_port()
+        command = gunicorn_command(port, workers, args.threads)
+        with running_server(command, port, env) as url:
+            result = run_load(url, read_mix, args.concurrency, args.duration)
+            report(f'gunicorn {workers}w x {args.threads}t', result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,343 @@
+"""Small HTTP load generator and server helpers shared by the benchmarks.
+
+Only the standard library is used so the benchmarks run offline.
+"""
+import asyncio
+import contextlib
+from datetime import datetime
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    last = len(sorted_values) - 1
+    index = min(last, int(round(pct / 100 * last)))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    total = len(latencies) + errors
+    return {
+        'requests': total,
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'rps': round(total / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def run_load(base_url, make_request, concurrency=8, duration=5.0):
+    """Drive a server from `concurrency` threads for `duration` seconds.
+
+    make_request(worker_index, iteration) returns (method, path, body) where
+    body is JSON bytes, a dict sent as a form, or None, optionally followed by
+    a dict of extra request headers. Each thread keeps one
+    keep-alive connection. Responses with status >= 400 other than 404 count
+    as errors.
+    """
+    parsed = urllib.parse.urlparse(base_url)
+    deadline = time.perf_counter() + duration
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(index):
+        conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+        local = []
+        local_errors = 0
+        iteration = 0
+        while time.perf_counter() < deadline:
+            method, path, body, *extra = make_request(index, iteration)
+            iteration += 1
+            headers = dict(extra[0]) if extra else {}
+            if isinstance(body, dict):
+                body = urllib.parse.urlencode(body).encode()
+                headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            elif body is not None:
+                headers['Content-Type'] = 'application/json'
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400 and response.status != 404:
+                    local_errors += 1
+                else:
+                    local.append(time.perf_counter() - start)
+                if response.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(parsed.hostname, parsed.port,
+                                                  timeout=30)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, errors[0], time.perf_counter() - start)
+
+
+async def _read_response(reader):
+    """Read one HTTP/1.1 response and return (status, close_connection)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip().lower()
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    return status, headers.get('connection') == 'close'
+
+
+def run_load_async(base_url, make_request, concurrency=100, duration=5.0):
+    """Like run_load, but with asyncio connections instead of threads.
+
+    Lets a single process hold hundreds of concurrent keep-alive clients
+    without the client becoming the bottleneck.
+    """
+    parsed = urllib.parse.urlparse(base_url)
+    host, port = parsed.hostname, parsed.port
+    latencies = []
+    errors = [0]
+
+    async def client(index, deadline):
+        loop = asyncio.get_running_loop()
+        reader = writer = None
+        iteration = 0
+        while loop.time() < deadline:
+            method, path, body = make_request(index, iteration)
+            iteration += 1
+            body = body or b''
+            head = f'{method} {path} HTTP/1.1\r\nHost: {host}:{port}\r\n'
+            if body:
+                head += 'Content-Type: application/json\r\n'
+            head += f'Content-Length: {len(body)}\r\n\r\n'
+            start = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(host, port)
+                writer.write(head.encode() + body)
+                await writer.drain()
+                status, close = await asyncio.wait_for(_read_response(reader), 30)
+                if status >= 400 and status != 404:
+                    errors[0] += 1
+                else:
+                    latencies.append(time.perf_counter() - start)
+            except (OSError, ValueError, asyncio.IncompleteReadError,
+                    asyncio.TimeoutError):
+                errors[0] += 1
+                close = True
+            if close and writer is not None:
+                writer.close()
+                reader = writer = None
+        if writer is not None:
+            writer.close()
+
+    async def main():
+        deadline = asyncio.get_running_loop().time() + duration
+        await asyncio.gather(*(client(i, deadline) for i in range(concurrency)))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return summarize(latencies, errors[0], time.perf_counter() - start)
+
+
+def wait_for_http(url, timeout=30.0):
+    parsed = urllib.parse.urlparse(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=2)
+            conn.request('GET', parsed.path or '/')
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Server at {url} did not start within {timeout}s')
+
+
+# Load from one address would otherwise be refused by the per-client limits and
+# load shedding; benchmarks that measure those turn them back on through env
+SERVER_ENV_DEFAULTS = {'RATE_LIMIT_BACKEND': 'none', 'ADMISSION_MAX_POOL_WAIT_MS': '0'}
+
+
+def start_server(args, port, env=None, ready_path='/api/tasks?limit=1'):
+    """Start a server subprocess from the repository root once it answers HTTP"""
+    full_env = dict(SERVER_ENV_DEFAULTS, **os.environ)
+    full_env.update(env or {})
+    process = subprocess.Popen(args, cwd=ROOT, env=full_env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_http(f'http://127.0.0.1:{port}{ready_path}')
+    except Exception:
+        stop_server(process)
+        raise
+    return process
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+@contextlib.contextmanager
+def running_server(args, port, env=None, ready_path='/api/tasks?limit=1'):
+    """Start a server subprocess from the repository root and stop it on exit"""
+    process = start_server(args, port, env, ready_path)
+    try:
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        stop_server(process)
+
+
+def process_tree_rss(pid):
+    """Resident memory in bytes of pid and its descendants, from /proc (Linux only)"""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+            for task in os.listdir(f'/proc/{current}/task'):
+                with open(f'/proc/{current}/task/{task}/children') as children:
+                    pending.extend(int(child) for child in children.read().split())
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+class PeakRssSampler:
+    """Track the peak RSS of a server's process tree while a load test runs.
+
+    peak is None where /proc is unavailable (e.g. macOS).
+    """
+
+    def __init__(self, pid, interval=0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        if os.path.exists(f'/proc/{self.pid}'):
+            self.peak = max(self.peak or 0, process_tree_rss(self.pid))
+
+    def __enter__(self):
+        self.peak = None
+        self._stop.clear()
+        self.sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+
+def dev_server_command(port):
+    """Today's `python app.py` server: Werkzeug with the debugger, no reloader"""
+    code = ('from app import app; '
+            f"app.run(host='127.0.0.1', port={port}, debug=True, use_reloader=False)")
+    return [sys.executable, '-c', code]
+
+
+def gunicorn_command(port, workers, threads):
+    return [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py',
+            '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+            '--threads', str(threads), '--access-logfile', '/dev/null']
+
+
+def uvicorn_command(port, workers):
+    return [sys.executable, '-m', 'uvicorn', '--factory', 'async_api:create_async_app',
+            '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers),
+            '--no-access-log', '--log-level', 'warning']
+
+
+def seed_database(uri, rows, batch_size=10000):
+    """Recreate the task tables at uri and insert `rows` tasks.
+
+    Everything in the target database is dropped first, so point it at a
+    scratch database. A missing MySQL database is created.
+    """
+    sys.path.insert(0, ROOT)
+    os.environ['DATABASE_URL'] = uri
+    from app import create_app, db, import_tasks
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.engine import make_url
+
+    url = make_url(uri)
+    if url.get_backend_name() == 'mysql' and url.database:
+        server = create_engine(url.set(database=None))
+        with server.begin() as connection:
+            connection.execute(text(f'CREATE DATABASE IF NOT EXISTS `{url.database}`'))
+        server.dispose()
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'SLOW_QUERY_MS': 0})
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        import_tasks(
+            [(f'Task {i}', f'Seeded task {i}', i % 3 == 0, datetime.utcnow())
+             for i in range(start, min(rows, start + batch_size))]
+            for start in range(0, rows, batch_size))
+        db.session.remove()
+        db.engine.dispose()
+
+
+def seed_sqlite(path, rows, batch_size=10000):
+    """Create a SQLite task database at path with `rows` tasks"""
+    seed_database(f'sqlite:///{path}', rows, batch_size)
@@ -0,0 +1,272 @@
+"""Caches used in front of task reads.
+
+The read cache talks to a small backend interface so the default
+in-process LRU can be swapped for a Redis-compatible shared store.
+"""
+from collections import OrderedDict
+import json
+import threading
+import time
+
+
+class SharedVersion:
+    """Version loaded from the database and reused for up to ttl seconds.
+
+    Commits from other processes show up within ttl; invalidate() makes this
+    process see its own commits straight away.
+    """
+
+    def __init__(self, load, ttl):
+        self.load = load
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded_at = None
+        self._generation = 0
+
+    def get(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._loaded_at is not None and now - self._loaded_at <= self.ttl:
+                return self._value
+            generation = self._generation
+        value = self.load()
+        with self._lock:
+            # A commit that invalidated us during the load may not be in value
+            if generation == self._generation:
+                self._value, self._loaded_at = value, now
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._loaded_at = None
+
+
+class FragmentCache:
+    """Bounded LRU cache of rendered HTML keyed on a shared version.
+
+    Entries rendered for an older version, or older than ttl seconds, are
+    treated as misses.
+    """
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_version, stored_at, value = entry
+            if entry_version != version or time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, version, value):
+        with self._lock:
+            self._entries[key] = (version, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class CacheBackend:
+    """Interface implemented by read cache stores.
+
+    Values are bytes. Keys are strings, and the store may expire entries
+    after ttl seconds.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        return {}
+
+
+class NullCache(CacheBackend):
+    """Backend that stores nothing, used when caching is disabled"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def clear(self):
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU store bounded by entry count, with per-entry TTL"""
+
+    def __init__(self, max_entries=1024, default_ttl=None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class RedisCache(CacheBackend):
+    """Backend for any client exposing the redis-py get/set/delete API"""
+
+    def __init__(self, client, prefix='taskmanager:', default_ttl=None):
+        self.client = client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        self.client.set(self.prefix + key, value, ex=int(ttl) if ttl else None)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_cache_backend(kind, max_entries=1024, ttl=None, redis_url=None):
+    """Build a cache backend from configuration values"""
+    if kind == 'none':
+        return NullCache()
+    if kind == 'memory':
+        return MemoryCache(max_entries=max_entries, default_ttl=ttl)
+    if kind == 'redis':
+        import redis
+        return RedisCache(redis.Redis.from_url(redis_url), default_ttl=ttl)
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+class ReadThroughCache:
+    """Response cache with hit/miss counters.
+
+    Entries are JSON-serializable dicts. Callers put a version in the key
+    instead of invalidating entries. A failing backend turns reads into
+    misses and writes into no-ops instead of failing the request.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _failed(self):
+        with self._lock:
+            self.errors += 1
+
+    def get(self, key):
+        try:
+            raw = self.backend.get(key)
+        except Exception:
+            raw = None
+            self._failed()
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, entry, ttl=None):
+        try:
+            data = json.dumps(entry, separators=(',', ':')).encode()
+            self.backend.set(key, data, ttl)
+        except Exception:
+            self._failed()
+
+    def delete(self, *keys):
+        try:
+            self.backend.delete(*keys)
+        except Exception:
+            self._failed()
+
+    def clear(self):
+        try:
+            self.backend.clear()
+        except Exception:
+            self._failed()
+
+    def stats(self):
+        with self._lock:
+            counters = {
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+            }
+        counters.update(self.backend.stats())
+        counters.setdefault('evictions', 0)
+        return counters
@@ -0,0 +1,266 @@
+"""Engine and connection pool configuration for the task database."""
+from collections import deque
+import os
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+SQLITE_JOURNAL_MODES = ('delete', 'truncate', 'persist', 'memory', 'wal', 'off')
+SQLITE_SYNCHRONOUS_LEVELS = ('off', 'normal', 'full', 'extra')
+
+
+class PoolMetrics:
+    """Checkout wait times and outcomes for one connection pool.
+
+    recent_wait() is a moving average of checkout waits that also halves
+    every half_life seconds without checkouts, so it falls back to zero
+    once load is shed rather than staying at its last value.
+    """
+
+    def __init__(self, samples=2048, half_life=1.0, weight=0.2):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=samples)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.half_life = half_life
+        self.weight = weight
+        self._recent = 0.0
+        self._recent_at = time.monotonic()
+
+    def _decayed(self, now):
+        return self._recent * 0.5 ** ((now - self._recent_at) / self.half_life)
+
+    def recent_wait(self):
+        """Seconds checkouts have been waiting lately"""
+        return self._decayed(time.monotonic())
+
+    def record(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            self._waits.append(seconds)
+            now = time.monotonic()
+            self._recent = (self._decayed(now) * (1 - self.weight)
+                            + seconds * self.weight)
+            self._recent_at = now
+
+    def snapshot(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            counters = {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': self.wait_seconds_total,
+                'wait_seconds_max': self.wait_seconds_max,
+                'wait_seconds_recent': round(self._decayed(time.monotonic()), 6),
+            }
+        for pct in (50, 99):
+            index = min(len(waits) - 1, int(len(waits) * pct / 100)) if waits else None
+            counters[f'wait_seconds_p{pct}'] = waits[index] if waits else 0.0
+        return counters
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that measures how long each checkout waits for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+
+def is_memory_sqlite(uri):
+    return uri.startswith('sqlite') and (':memory:' in uri
+                                         or uri.rstrip('/') == 'sqlite:')
+
+
+def is_file_sqlite(uri):
+    return uri.startswith('sqlite') and not is_memory_sqlite(uri)
+
+
+def uses_sqlite_read_pool(config):
+    """Whether reads get their own pool of read-only connections to a SQLite file"""
+    return config['SQLITE_READ_WRITE_SPLIT'] and \
+        is_file_sqlite(config['SQLALCHEMY_DATABASE_URI'])
+
+
+def build_engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS derived from the DB_POOL_* settings.
+
+    In-memory SQLite keeps Flask-SQLAlchemy's single shared connection, so
+    only pre-ping applies there. With a SQLite read pool, this is the writer
+    and holds a single connection: SQLite allows one writer at a time, and
+    queueing in the pool is cheaper than retrying on "database is locked".
+    """
+    options = {'pool_pre_ping': config['DB_POOL_PRE_PING']}
+    if is_memory_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        return options
+    options.update({
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+    })
+    if uses_sqlite_read_pool(config):
+        options.update({'pool_size': 1, 'max_overflow': 0})
+    return options
+
+
+def create_sqlite_read_engine(url, config):
+    """Engine of read-only connections to the SQLite file at url.
+
+    The file is opened as a SQLite URI with mode=ro, so these connections
+    cannot write even by mistake. The pool is sized by the DB_POOL_* settings.
+    """
+    url = make_url(url)
+    database = url.database
+    if url.query.get('uri') != 'true':
+        database = f'file:{database}'
+    read_only = url.set(database=database, query=dict(url.query, mode='ro', uri='true'))
+    return create_engine(read_only,
+                         poolclass=InstrumentedQueuePool,
+                         pool_pre_ping=config['DB_POOL_PRE_PING'],
+                         pool_size=config['DB_POOL_SIZE'],
+                         max_overflow=config['DB_MAX_OVERFLOW'],
+                         pool_timeout=config['DB_POOL_TIMEOUT'],
+                         pool_recycle=config['DB_POOL_RECYCLE'])
+
+
+def create_replica_engine(url, config, instance_path):
+    """Engine for a read replica, pooled like the primary.
+
+    A SQLite replica (the local stand-in) is opened read-only, with a
+    relative path resolved against the instance folder as for the primary.
+    """
+    url = make_url(url)
+    if url.get_backend_name() != 'sqlite':
+        uri = url.render_as_string(hide_password=False)
+        return create_engine(url, **build_engine_options(
+            dict(config, SQLALCHEMY_DATABASE_URI=uri)))
+    path = url.database[5:] if url.database.startswith('file:') else url.database
+    if not os.path.isabs(path):
+        path = os.path.join(instance_path, path)
+    engine = create_sqlite_read_engine(url.set(database=path), config)
+    install_sqlite_pragmas(engine, sqlite_pragmas(config, read_only=True))
+    return engine
+
+
+def sqlite_pragmas(config, read_only=False):
+    """(name, value) PRAGMAs applied to every new SQLite connection.
+
+    journal_mode is persistent and stored in the file, so only writers set
+    it; read-only connections also refuse writes with query_only.
+    """
+    journal_mode = config['SQLITE_JOURNAL_MODE'].lower()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError('SQLITE_JOURNAL_MODE must be one of '
+                         f"{', '.join(SQLITE_JOURNAL_MODES)}")
+    synchronous = config['SQLITE_SYNCHRONOUS'].lower()
+    if synchronous not in SQLITE_SYNCHRONOUS_LEVELS:
+        raise ValueError('SQLITE_SYNCHRONOUS must be one of '
+                         f"{', '.join(SQLITE_SYNCHRONOUS_LEVELS)}")
+    pragmas = [
+        ('busy_timeout', int(config['SQLITE_BUSY_TIMEOUT_MS'])),
+        # Negative cache_size is in KiB rather than pages
+        ('cache_size', -int(config['SQLITE_CACHE_SIZE_KB'])),
+        ('mmap_size', int(config['SQLITE_MMAP_SIZE'])),
+        ('synchronous', synchronous),
+    ]
+    if read_only:
+        pragmas.append(('query_only', 'on'))
+    else:
+        pragmas.insert(0, ('journal_mode', journal_mode))
+    return pragmas
+
+
+def install_sqlite_pragmas(engine, pragmas, begin_immediate=False):
+    """Apply pragmas to each new connection of a SQLite engine.
+
+    With begin_immediate, transactions start with BEGIN IMMEDIATE, which
+    takes the write lock up front. A deferred transaction that reads and
+    then writes can fail with "database is locked" straight away, without
+    waiting out busy_timeout, if another connection wrote in between.
+    """
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+        if begin_immediate:
+            # Stop pysqlite from issuing its own deferred BEGIN
+            dbapi_connection.isolation_level = None
+
+    if begin_immediate:
+        @event.listens_for(engine, 'begin')
+        def begin(connection):
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+def pool_status(engine):
+    """Occupancy and checkout wait metrics of an engine's pool"""
+    pool = engine.pool
+    status = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        status.update({
+            'size': pool.size(),
+            'max_overflow': pool._max_overflow,
+            'checked_in': pool.checkedin(),
+            'checked_out': checked_out,
+            'overflow': pool.overflow(),
+            'saturation': round(checked_out / capacity, 4) if capacity else 0.0,
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        status.update(pool.metrics.snapshot())
+    return status
+
+
+class CachedCheck:
+    """Reuses the (ok, error) result of a health check for ttl seconds.
+
+    The first caller to find the result stale re-runs the check; concurrent
+    callers keep answering with the previous result instead of queueing
+    behind it, so frequent probes cost at most one check per ttl.
+    """
+
+    def __init__(self, check, ttl):
+        self.check = check
+        self.ttl = ttl
+        self.result = None
+        self.checked_at = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """(ok, error, seconds since the check ran)"""
+        if self.checked_at is None or time.monotonic() - self.checked_at >= self.ttl:
+            # Only the very first check makes callers wait for it
+            if self._lock.acquire(blocking=self.checked_at is None):
+                try:
+                    self.result = self.check()
+                    self.checked_at = time.monotonic()
+                finally:
+                    self._lock.release()
+        ok, error = self.result
+        return ok, error, time.monotonic() - self.checked_at
@@ -0,0 +1,56 @@
+"""Gunicorn settings for serving the Task Manager in production.
+
+Every setting can be overridden through environment variables:
+
+    gunicorn --config gunicorn.conf.py
+
+Send SIGHUP to the master to gracefully replace the workers. With
+GUNICORN_PRELOAD=true (the default) the application is imported once in the
+master before forking, so a code change needs a full restart instead.
+"""
+import multiprocessing
+import os
+
+
+def env_bool(name, default):
+    value = os.environ.get(name, str(default)).strip().lower()
+    return value in ('1', 'true', 'yes', 'on')
+
+
+# Importing app already builds the application; calling create_app() again
+# would give every process a second, unused set of engines and caches
+wsgi_app = 'app:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Worker processes and threads per worker; gthread keeps idle keep-alive
+# connections off the worker threads
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers periodically to bound memory growth; jitter avoids
+# restarting every worker at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+preload_app = env_bool('GUNICORN_PRELOAD', True)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    # Database connections opened in the master must not be shared across
+    # processes; drop every engine's pool without closing the master's sockets
+    from app import app_engines
+
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in app_engines():
+            engine.dispose(close=False)
@@ -7,7 +7,13 @@ CREATE TABLE IF NOT EXISTS task (
     title VARCHAR(100) NOT NULL,
     description TEXT,
     completed BOOLEAN DEFAULT FALSE,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    -- Same indexes as the Task model and the Alembic migrations
+    INDEX ix_task_completed_id (completed, id),
+    INDEX ix_task_completed_created_at (completed, created_at, id),
+    INDEX ix_task_created_at_id (created_at, id),
+    -- Full-text search for /api/tasks/search
+    FULLTEXT INDEX ft_task_title_description (title, description)
 );
 
 -- Insert some sample data for testing
@@ -0,0 +1,70 @@
+"""Flask JSON provider that encodes responses with orjson when it is installed.
+
+Responses stay byte-identical to Flask's default provider: orjson is only
+used for compact output with the default sort_keys/ensure_ascii settings,
+and its result is discarded in favour of the stdlib encoder whenever the two
+could differ.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; Flask's stdlib encoder is used without it
+    orjson = None
+
+COMPACT = {'separators': (',', ':')}
+
+# orjson's output can differ from json.dumps(ensure_ascii=True) in three
+# ways: unescaped DEL/non-ASCII characters, floats with an exponent (1e16
+# rather than 1e+16), and floats below 1e-4, which orjson writes as 0.0000...
+# where repr() switches to an exponent. Other floats are formatted alike.
+# Mapping digits to 0 turns the exponent check into a substring test, which
+# is an order of magnitude faster than a regex over a large body.
+DIGITS_TO_ZERO = bytes.maketrans(b'123456789E', b'000000000e')
+
+
+def stdlib_compatible(data):
+    """Whether orjson output data is what the stdlib encoder would write.
+
+    Strings that merely contain these sequences also fail, which only costs a
+    fallback to the stdlib encoder.
+    """
+    return data.isascii() and b'\x7f' not in data and b'0.0000' not in data and \
+        b'0e' not in data.translate(DIGITS_TO_ZERO)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with an orjson fast path for compact dumps.
+
+    NaN and infinities are the one exception to byte compatibility: the
+    stdlib writes them as invalid JSON (NaN, Infinity), orjson as null.
+    """
+
+    def __init__(self, app):
+        if orjson is None:
+            raise RuntimeError('OrjsonProvider needs the orjson package')
+        super().__init__(app)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs == COMPACT and self.sort_keys and self.ensure_ascii:
+            try:
+                data = orjson.dumps(obj, default=self.default,
+                                    option=(orjson.OPT_SORT_KEYS
+                                            | orjson.OPT_PASSTHROUGH_DATETIME
+                                            | orjson.OPT_PASSTHROUGH_DATACLASS))
+            except TypeError:
+                # Unsupported keys or values, or ints beyond 64 bits
+                pass
+            else:
+                if stdlib_compatible(data):
+                    return data.decode('ascii')
+        return super().dumps(obj, **kwargs)
+
+
+def create_json_provider(app, kind):
+    """JSON provider for JSON_PROVIDER: auto (orjson if installed), orjson or stdlib"""
+    if kind == 'stdlib' or (kind == 'auto' and orjson is None):
+        return DefaultJSONProvider(app)
+    if kind in ('auto', 'orjson'):
+        return OrjsonProvider(app)
+    raise ValueError(f'Unknown JSON provider: {kind}')
@@ -0,0 +1,133 @@
+"""Request and SQL metrics rendered in the Prometheus text exposition format.
+
+Metrics are kept in process memory, so with several gunicorn workers each
+scrape of /metrics sees the worker that served it.
+"""
+from bisect import bisect_left
+import threading
+
+# Upper bounds in seconds for request latency and per-request SQL time
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0)
+# Upper bounds for the number of SQL statements one request runs
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+class Histogram:
+    """Fixed-bucket histogram; not thread-safe on its own"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"')
+         .replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RequestMetrics:
+    """Per-endpoint request latency, status codes, in-flight requests and SQL load"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.latency = {}
+        self.responses = {}
+        self.statements = {}
+        self.statement_seconds = {}
+        self.statements_total = 0
+        self.slow_statements_total = 0
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self, endpoint, method, status, seconds, statements,
+                         statement_seconds):
+        key = (endpoint, method)
+        with self._lock:
+            self.in_flight -= 1
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.statements[key] = Histogram(STATEMENT_BUCKETS)
+                self.statement_seconds[key] = Histogram(LATENCY_BUCKETS)
+            self.latency[key].observe(seconds)
+            self.statements[key].observe(statements)
+            self.statement_seconds[key].observe(statement_seconds)
+            status_key = key + (status,)
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+
+    def statement_executed(self, slow=False):
+        with self._lock:
+            self.statements_total += 1
+            if slow:
+                self.slow_statements_total += 1
+
+    def render(self):
+        """All metrics in the Prometheus text format (version 0.0.4)"""
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        def histogram(name, help_text, series):
+            header(name, 'histogram', help_text)
+            for (endpoint, method), hist in sorted(series.items()):
+                labels = (('endpoint', endpoint), ('method', method))
+                for bound, total in hist.cumulative():
+                    le = bound if bound == '+Inf' else format_value(float(bound))
+                    bucket_labels = format_labels(labels + (('le', le),))
+                    lines.append(f'{name}_bucket{bucket_labels} {total}')
+                lines.append(f'{name}_sum{format_labels(labels)} '
+                             f'{format_value(hist.sum)}')
+                lines.append(f'{name}_count{format_labels(labels)} {hist.count}')
+
+        with self._lock:
+            header('http_requests_in_flight', 'gauge',
+                   'Requests currently being served.')
+            lines.append(f'http_requests_in_flight {self.in_flight}')
+            header('http_requests_total', 'counter',
+                   'Requests served by endpoint, method and status.')
+            for (endpoint, method, status), count in sorted(self.responses.items()):
+                labels = (('endpoint', endpoint), ('method', method),
+                          ('status', status))
+                lines.append(f'http_requests_total{format_labels(labels)} {count}')
+            histogram('http_request_duration_seconds',
+                      'Time to produce a response, by endpoint.', self.latency)
+            histogram('db_statements_per_request',
+                      'SQL statements executed per request, by endpoint.',
+                      self.statements)
+            histogram('db_statement_seconds_per_request',
+                      'Time spent executing SQL per request, by endpoint.',
+                      self.statement_seconds)
+            header('db_statements_total', 'counter', 'SQL statements executed.')
+            lines.append(f'db_statements_total {self.statements_total}')
+            header('db_slow_statements_total', 'counter',
+                   'SQL statements slower than the slow query threshold.')
+            lines.append(f'db_slow_statements_total {self.slow_statements_total}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,40 @@
+"""create task and task_version tables
+
+Revision ID: 492b9df57a4d
+Revises:
+Create Date: 2026-10-17 01:55:42.591808
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '492b9df57a4d'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'task',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('completed', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    task_version = op.create_table(
+        'task_version',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.bulk_insert(task_version, [{'name': 'tasks', 'value': 0}])
+
+
+def downgrade():
+    op.drop_table('task_version')
+    op.drop_table('task')
@@ -0,0 +1,33 @@
+"""add task indexes
+
+Revision ID: 7c1e2d4f9a30
+Revises: 492b9df57a4d
+Create Date: 2026-10-17 02:04:11.218377
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e2d4f9a30'
+down_revision = '492b9df57a4d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # completed filter with keyset paging on id or created_at, and created_at
+    # ranges/ordering; the trailing id keeps the keyset order index-only
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.create_index('ix_task_completed_id', ['completed', 'id'], unique=False)
+        batch_op.create_index('ix_task_completed_created_at',
+                              ['completed', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_task_created_at_id', ['created_at', 'id'],
+                              unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_created_at_id')
+        batch_op.drop_index('ix_task_completed_created_at')
+        batch_op.drop_index('ix_task_completed_id')
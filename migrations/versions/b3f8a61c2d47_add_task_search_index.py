@@ -0,0 +1,60 @@
+"""add task full-text search index
+
+Revision ID: b3f8a61c2d47
+Revises: 7c1e2d4f9a30
+Create Date: 2026-10-17 09:12:40.518204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f8a61c2d47'
+down_revision = '7c1e2d4f9a30'
+branch_labels = None
+depends_on = None
+
+# Same statements as SQLITE_SEARCH_DDL in app.py
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+    "title, description, content='task', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_update "
+    "AFTER UPDATE OF title, description ON task "
+    "BEGIN INSERT INTO task_fts(task_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO task_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+)
+
+
+def sqlite_has_fts5(bind):
+    options = bind.exec_driver_sql('PRAGMA compile_options').scalars().all()
+    return 'ENABLE_FTS5' in options
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'mysql':
+        op.create_index('ft_task_title_description', 'task', ['title', 'description'],
+                        mysql_prefix='FULLTEXT')
+    elif bind.dialect.name == 'sqlite' and sqlite_has_fts5(bind):
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        # Index the rows that existed before the triggers
+        op.execute("INSERT INTO task_fts(task_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'mysql':
+        op.drop_index('ft_task_title_description', table_name='task')
+    elif bind.dialect.name == 'sqlite':
+        for trigger in ('task_fts_update', 'task_fts_delete', 'task_fts_insert'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS task_fts')
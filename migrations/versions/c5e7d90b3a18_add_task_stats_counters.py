@@ -0,0 +1,97 @@
+"""add task stats counters
+
+Revision ID: c5e7d90b3a18
+Revises: b3f8a61c2d47
+Create Date: 2026-10-17 11:40:02.731945
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e7d90b3a18'
+down_revision = 'b3f8a61c2d47'
+branch_labels = None
+depends_on = None
+
+# Same statements as SQLITE_STATS_DDL and MYSQL_STATS_DDL in app.py
+SQLITE_STATS_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS task_stats_insert AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_counter (name, value) VALUES "
+    "('total', 1), ('completed', coalesce(new.completed, 0)) "
+    "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value; "
+    "INSERT INTO task_daily_count (day, created) SELECT date(new.created_at), 1 "
+    "WHERE new.created_at IS NOT NULL "
+    "ON CONFLICT (day) DO UPDATE SET created = created + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS task_stats_delete AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_counter (name, value) VALUES "
+    "('total', -1), ('completed', -coalesce(old.completed, 0)) "
+    "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value; "
+    "UPDATE task_daily_count SET created = created - 1 "
+    "WHERE day = date(old.created_at); END",
+    "CREATE TRIGGER IF NOT EXISTS task_stats_update AFTER UPDATE OF completed ON task "
+    "WHEN coalesce(old.completed, 0) <> coalesce(new.completed, 0) BEGIN "
+    "INSERT INTO task_counter (name, value) VALUES "
+    "('completed', coalesce(new.completed, 0) - coalesce(old.completed, 0)) "
+    "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value; END",
+)
+MYSQL_STATS_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS task_stats_insert AFTER INSERT ON task "
+    "FOR EACH ROW BEGIN "
+    "INSERT INTO task_counter (name, value) VALUES "
+    "('total', 1), ('completed', COALESCE(NEW.completed, 0)) "
+    "ON DUPLICATE KEY UPDATE value = value + VALUES(value); "
+    "IF NEW.created_at IS NOT NULL THEN "
+    "INSERT INTO task_daily_count (day, created) VALUES (DATE(NEW.created_at), 1) "
+    "ON DUPLICATE KEY UPDATE created = created + 1; END IF; END",
+    "CREATE TRIGGER IF NOT EXISTS task_stats_delete AFTER DELETE ON task "
+    "FOR EACH ROW BEGIN "
+    "INSERT INTO task_counter (name, value) VALUES "
+    "('total', -1), ('completed', -COALESCE(OLD.completed, 0)) "
+    "ON DUPLICATE KEY UPDATE value = value + VALUES(value); "
+    "UPDATE task_daily_count SET created = created - 1 "
+    "WHERE day = DATE(OLD.created_at); END",
+    "CREATE TRIGGER IF NOT EXISTS task_stats_update AFTER UPDATE ON task "
+    "FOR EACH ROW BEGIN "
+    "IF COALESCE(OLD.completed, 0) <> COALESCE(NEW.completed, 0) THEN "
+    "INSERT INTO task_counter (name, value) VALUES "
+    "('completed', COALESCE(NEW.completed, 0) - COALESCE(OLD.completed, 0)) "
+    "ON DUPLICATE KEY UPDATE value = value + VALUES(value); END IF; END",
+)
+
+TRIGGERS = ('task_stats_insert', 'task_stats_delete', 'task_stats_update')
+
+
+def upgrade():
+    op.create_table(
+        'task_counter',
+        sa.Column('name', sa.String(length=32), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.create_table(
+        'task_daily_count',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('created', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day'),
+    )
+    # Count the existing rows, then keep the counters current with triggers
+    op.execute("INSERT INTO task_counter (name, value) "
+               "SELECT 'total', COUNT(*) FROM task UNION ALL "
+               "SELECT 'completed', "
+               "COALESCE(SUM(CASE WHEN completed THEN 1 ELSE 0 END), 0) FROM task")
+    op.execute("INSERT INTO task_daily_count (day, created) "
+               "SELECT DATE(created_at), COUNT(*) FROM task "
+               "WHERE created_at IS NOT NULL GROUP BY DATE(created_at)")
+    dialect = op.get_bind().dialect.name
+    statements = {'sqlite': SQLITE_STATS_DDL, 'mysql': MYSQL_STATS_DDL}.get(dialect, ())
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade():
+    for trigger in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.drop_table('task_daily_count')
+    op.drop_table('task_counter')
@@ -0,0 +1,47 @@
+"""autoincrement sqlite task ids
+
+Revision ID: d8f2b6a1c947
+Revises: f7b3d2e8a915
+Create Date: 2026-10-17 21:04:18.316540
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8f2b6a1c947'
+down_revision = 'f7b3d2e8a915'
+branch_labels = None
+depends_on = None
+
+
+def rebuild_sqlite_task_table(autoincrement):
+    """Recreate the task table, keeping the triggers the rebuild would drop"""
+    bind = op.get_bind()
+    triggers = bind.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'task'"
+    ).scalars().all()
+    with op.batch_alter_table('task', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': autoincrement}):
+        pass
+    for statement in triggers:
+        op.execute(statement)
+
+
+def upgrade():
+    # Without AUTOINCREMENT SQLite hands out max(id) + 1, so deleting the newest
+    # task gives its id, or the id of an archived task, to the next one
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    rebuild_sqlite_task_table(True)
+    # Start new ids after every task ever archived as well
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'task'")
+    op.execute("INSERT INTO sqlite_sequence (name, seq) SELECT 'task', max("
+               "(SELECT coalesce(max(id), 0) FROM task), "
+               "(SELECT coalesce(max(id), 0) FROM task_archive))")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    rebuild_sqlite_task_table(False)
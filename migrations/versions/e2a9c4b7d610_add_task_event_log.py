@@ -0,0 +1,63 @@
+"""add task event log
+
+Revision ID: e2a9c4b7d610
+Revises: c5e7d90b3a18
+Create Date: 2026-10-17 15:12:44.208316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a9c4b7d610'
+down_revision = 'c5e7d90b3a18'
+branch_labels = None
+depends_on = None
+
+# Same statements as SQLITE_EVENTS_DDL and MYSQL_EVENTS_DDL in app.py
+SQLITE_EVENTS_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS task_event_insert AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_event (task_id, op) VALUES (new.id, 'created'); END",
+    "CREATE TRIGGER IF NOT EXISTS task_event_update AFTER UPDATE ON task BEGIN "
+    "INSERT INTO task_event (task_id, op) VALUES (new.id, CASE "
+    "WHEN new.completed IS NOT old.completed AND new.title IS old.title "
+    "AND new.description IS old.description THEN 'toggled' ELSE 'updated' END); END",
+    "CREATE TRIGGER IF NOT EXISTS task_event_delete AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_event (task_id, op) VALUES (old.id, 'deleted'); END",
+)
+MYSQL_EVENTS_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS task_event_insert AFTER INSERT ON task FOR EACH ROW "
+    "INSERT INTO task_event (task_id, op) VALUES (NEW.id, 'created')",
+    "CREATE TRIGGER IF NOT EXISTS task_event_update AFTER UPDATE ON task FOR EACH ROW "
+    "INSERT INTO task_event (task_id, op) VALUES (NEW.id, CASE "
+    "WHEN NOT (NEW.completed <=> OLD.completed) AND NEW.title <=> OLD.title "
+    "AND NEW.description <=> OLD.description THEN 'toggled' ELSE 'updated' END)",
+    "CREATE TRIGGER IF NOT EXISTS task_event_delete AFTER DELETE ON task FOR EACH ROW "
+    "INSERT INTO task_event (task_id, op) VALUES (OLD.id, 'deleted')",
+)
+
+TRIGGERS = ('task_event_insert', 'task_event_update', 'task_event_delete')
+
+
+def upgrade():
+    op.create_table(
+        'task_event',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'),
+                  nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=True),
+        sa.Column('op', sa.String(length=8), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=True,
+    )
+    dialect = op.get_bind().dialect.name
+    statements = {'sqlite': SQLITE_EVENTS_DDL,
+                  'mysql': MYSQL_EVENTS_DDL}.get(dialect, ())
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade():
+    for trigger in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.drop_table('task_event')
@@ -0,0 +1,83 @@
+"""add task archive
+
+Revision ID: f7b3d2e8a915
+Revises: e2a9c4b7d610
+Create Date: 2026-10-17 16:05:31.640172
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7b3d2e8a915'
+down_revision = 'e2a9c4b7d610'
+branch_labels = None
+depends_on = None
+
+# Same statements as SQLITE_ARCHIVE_STATS_DDL and MYSQL_ARCHIVE_STATS_DDL in app.py
+SQLITE_ARCHIVE_STATS_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS task_archive_stats_insert "
+    "AFTER INSERT ON task_archive BEGIN "
+    "INSERT INTO task_counter (name, value) VALUES ('archived', 1) "
+    "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value; "
+    "INSERT INTO task_daily_count (day, created) SELECT date(new.created_at), 1 "
+    "WHERE new.created_at IS NOT NULL "
+    "ON CONFLICT (day) DO UPDATE SET created = created + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS task_archive_stats_delete "
+    "AFTER DELETE ON task_archive BEGIN "
+    "INSERT INTO task_counter (name, value) VALUES ('archived', -1) "
+    "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value; "
+    "UPDATE task_daily_count SET created = created - 1 "
+    "WHERE day = date(old.created_at); END",
+)
+MYSQL_ARCHIVE_STATS_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS task_archive_stats_insert "
+    "AFTER INSERT ON task_archive "
+    "FOR EACH ROW BEGIN "
+    "INSERT INTO task_counter (name, value) VALUES ('archived', 1) "
+    "ON DUPLICATE KEY UPDATE value = value + VALUES(value); "
+    "IF NEW.created_at IS NOT NULL THEN "
+    "INSERT INTO task_daily_count (day, created) VALUES (DATE(NEW.created_at), 1) "
+    "ON DUPLICATE KEY UPDATE created = created + 1; END IF; END",
+    "CREATE TRIGGER IF NOT EXISTS task_archive_stats_delete "
+    "AFTER DELETE ON task_archive "
+    "FOR EACH ROW BEGIN "
+    "INSERT INTO task_counter (name, value) VALUES ('archived', -1) "
+    "ON DUPLICATE KEY UPDATE value = value + VALUES(value); "
+    "UPDATE task_daily_count SET created = created - 1 "
+    "WHERE day = DATE(OLD.created_at); END",
+)
+
+TRIGGERS = ('task_archive_stats_insert', 'task_archive_stats_delete')
+
+
+def upgrade():
+    op.create_table(
+        'task_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('completed', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    with op.batch_alter_table('task_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_task_archive_completed_id',
+                              ['completed', 'id'], unique=False)
+        batch_op.create_index('ix_task_archive_created_at_id',
+                              ['created_at', 'id'], unique=False)
+    dialect = op.get_bind().dialect.name
+    for statement in {'sqlite': SQLITE_ARCHIVE_STATS_DDL,
+                      'mysql': MYSQL_ARCHIVE_STATS_DDL}.get(dialect, ()):
+        op.execute(statement)
+
+
+def downgrade():
+    for trigger in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    with op.batch_alter_table('task_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_archive_created_at_id')
+        batch_op.drop_index('ix_task_archive_completed_id')
+    op.drop_table('task_archive')
@@ -0,0 +1,197 @@
+"""Per-client rate limiting and load-shedding admission control.
+
+Rate limits are token buckets: each client may burst up to `burst`
+requests, refilled at `rate` per second. Buckets live behind a small store
+interface. The in-process store is per worker, so with several gunicorn
+workers a client's effective limit is multiplied by the worker count; the
+Redis store shares buckets between workers and hosts.
+
+Admission control protects the database for everyone: once a worker is
+serving too many requests at once, or its connection checkouts have
+recently been waiting too long, new requests are refused straight away
+instead of queueing for the pool.
+"""
+from collections import OrderedDict
+import threading
+import time
+
+
+class TokenBucketStore:
+    """Interface implemented by token bucket stores.
+
+    take(key, rate, burst) spends one token from the bucket at key, which
+    holds at most burst tokens and refills at rate tokens per second. It
+    returns (allowed, seconds until a token is available).
+    """
+
+    def take(self, key, rate, burst):
+        raise NotImplementedError
+
+    def stats(self):
+        return {}
+
+
+class MemoryTokenBuckets(TokenBucketStore):
+    """Per-process buckets; beyond max_keys the least recently used is dropped.
+
+    A dropped bucket starts full again, which only matters for clients idle
+    long enough to have refilled anyway.
+    """
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def stats(self):
+        return {'backend': 'memory', 'clients': len(self._buckets),
+                'max_clients': self.max_keys}
+
+
+# Atomic take() on a Redis hash, timed by the Redis clock so every worker agrees
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(retry)}
+"""
+
+
+class RedisTokenBuckets(TokenBucketStore):
+    """Buckets shared through any client exposing redis-py's eval()"""
+
+    def __init__(self, client, prefix='taskmanager:ratelimit:'):
+        self.client = client
+        self.prefix = prefix
+
+    def take(self, key, rate, burst):
+        allowed, retry = self.client.eval(TOKEN_BUCKET_LUA, 1, self.prefix + key,
+                                          rate, burst)
+        return bool(allowed), float(retry)
+
+    def stats(self):
+        return {'backend': 'redis'}
+
+
+def create_token_bucket_store(kind, max_keys=10000, redis_url=None):
+    """Build a token bucket store from configuration values; None for 'none'"""
+    if kind == 'none':
+        return None
+    if kind == 'memory':
+        return MemoryTokenBuckets(max_keys=max_keys)
+    if kind == 'redis':
+        import redis
+        return RedisTokenBuckets(redis.Redis.from_url(redis_url))
+    raise ValueError(f"Unknown rate limit backend: {kind}")
+
+
+class RateLimiter:
+    """Applies a read and a write limit per client, counting what it refuses.
+
+    limits maps a kind ('read', 'write') to (rate, burst); a rate of 0
+    leaves that kind unlimited. A failing store lets requests through
+    rather than failing them.
+    """
+
+    def __init__(self, store, limits):
+        self.store = store
+        self.limits = limits
+        self._lock = threading.Lock()
+        self.limited = dict.fromkeys(limits, 0)
+        self.errors = 0
+
+    def check(self, client, kind):
+        """(allowed, retry_after seconds) for one request of kind from client"""
+        rate, burst = self.limits[kind]
+        if rate <= 0:
+            return True, 0.0
+        try:
+            allowed, retry_after = self.store.take(f'{kind}:{client}', rate,
+                                                   max(burst, 1))
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            return True, 0.0
+        if not allowed:
+            with self._lock:
+                self.limited[kind] += 1
+        return allowed, retry_after
+
+    def stats(self):
+        return dict(self.store.stats(), limited=dict(self.limited), errors=self.errors,
+                    limits={kind: {'rate': rate, 'burst': burst}
+                            for kind, (rate, burst) in self.limits.items()})
+
+
+class AdmissionController:
+    """Refuses requests while the worker is overloaded.
+
+    Overloaded means max_in_flight requests are already being served, or
+    pool_wait() (seconds connection checkouts have waited lately) is above
+    max_pool_wait. A limit of 0 turns that check off. Every admitted
+    request must be paired with a call to leave().
+    """
+
+    def __init__(self, max_in_flight=0, max_pool_wait=0.0, pool_wait=None):
+        self.max_in_flight = max_in_flight
+        self.max_pool_wait = max_pool_wait
+        self.pool_wait = pool_wait
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = {'in_flight': 0, 'pool_wait': 0}
+        self._lock = threading.Lock()
+
+    def enter(self):
+        """Admit a request; returns None, or why it was refused"""
+        reason = None
+        if self.max_pool_wait > 0 and self.pool_wait is not None and \
+                self.pool_wait() > self.max_pool_wait:
+            reason = 'pool_wait'
+        with self._lock:
+            if reason is None and 0 < self.max_in_flight <= self.in_flight:
+                reason = 'in_flight'
+            if reason is None:
+                self.in_flight += 1
+                self.admitted += 1
+            else:
+                self.shed[reason] += 1
+        return reason
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self):
+        return {'in_flight': self.in_flight, 'max_in_flight': self.max_in_flight,
+                'max_pool_wait_seconds': self.max_pool_wait,
+                'pool_wait_seconds': (round(self.pool_wait(), 6)
+                                      if self.pool_wait else 0.0),
+                'admitted': self.admitted, 'shed': dict(self.shed)}
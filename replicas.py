@@ -0,0 +1,125 @@
+"""Read replica selection with a replication lag safety threshold.
+
+Lag is re-measured at most every check_interval seconds, by whichever
+request first finds the measurement stale, so no background thread has to
+survive gunicorn's fork. Replicas that lag more than max_lag, or cannot be
+reached, are skipped until a later measurement clears them.
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+
+def sqlite_path(url):
+    """Filesystem path of a SQLite URL, including file: URIs"""
+    database = make_url(url).database or ''
+    return database[5:] if database.startswith('file:') else database
+
+
+def sqlite_modified(path):
+    """Last time a SQLite file or its write-ahead log was written"""
+    return max((os.path.getmtime(name) for name in (path, path + '-wal')
+                if os.path.exists(name)), default=0.0)
+
+
+def mysql_replica_lag(connection):
+    """Seconds_Behind_Source of a MySQL replica; 0 for a server that is not one.
+
+    None (replication stopped or broken) counts as infinitely behind.
+    """
+    try:
+        row = connection.execute(text('SHOW REPLICA STATUS')).mappings().first()
+        column = 'Seconds_Behind_Source'
+    except Exception:
+        # MySQL before 8.0.22 and MariaDB
+        row = connection.execute(text('SHOW SLAVE STATUS')).mappings().first()
+        column = 'Seconds_Behind_Master'
+    if row is None:
+        return 0.0
+    return float('inf') if row[column] is None else float(row[column])
+
+
+def replica_lag_seconds(replica, primary):
+    """Replication lag of the replica engine behind the primary engine.
+
+    MySQL reports it directly. A SQLite replica is a stand-in copied with
+    `flask tasks sync-replica`: once the primary has changed since the last
+    copy, the replica counts as behind by the age of that copy.
+    """
+    if replica.dialect.name == 'mysql':
+        with replica.connect() as connection:
+            return mysql_replica_lag(connection)
+    if replica.dialect.name == 'sqlite' and primary.dialect.name == 'sqlite':
+        copied = sqlite_modified(sqlite_path(replica.url))
+        if sqlite_modified(sqlite_path(primary.url)) > copied:
+            return max(0.0, time.time() - copied)
+    return 0.0
+
+
+class ReplicaSet:
+    """Round-robin choice among the replicas that are within max_lag"""
+
+    def __init__(self, engines, measure_lag, max_lag, check_interval=1.0):
+        self.engines = list(engines)
+        self.measure_lag = measure_lag
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lags = [None] * len(self.engines)
+        self.checked_at = None
+        self.fallbacks = 0
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Measure every replica's lag now"""
+        lags = []
+        for engine in self.engines:
+            try:
+                lags.append(self.measure_lag(engine))
+            except Exception as e:
+                logger.warning('Replica %s is unavailable: %s',
+                               engine.url.render_as_string(hide_password=True), e)
+                lags.append(float('inf'))
+        self.lags = lags
+        self.checked_at = time.monotonic()
+
+    def _refresh_if_stale(self):
+        if self.checked_at is not None and \
+                time.monotonic() - self.checked_at < self.check_interval:
+            return
+        # One thread measures; the others keep using the previous lags
+        if self._lock.acquire(blocking=self.checked_at is None):
+            try:
+                self.refresh()
+            finally:
+                self._lock.release()
+
+    def choose(self):
+        """A replica engine within max_lag, or None to read from the primary"""
+        self._refresh_if_stale()
+        healthy = [engine for engine, lag in zip(self.engines, self.lags)
+                   if lag is not None and lag <= self.max_lag]
+        if not healthy:
+            self.fallbacks += 1
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def status(self):
+        return {
+            'max_lag_seconds': self.max_lag,
+            'fallbacks': self.fallbacks,
+            'replicas': [{'url': engine.url.render_as_string(hide_password=True),
+                          # Unreachable or stopped replicas show null rather than
+                          # Infinity
+                          'lag_seconds': (None if lag is None or lag == float('inf')
+                                          else lag),
+                          'healthy': lag is not None and lag <= self.max_lag}
+                         for engine, lag in zip(self.engines, self.lags)],
+        }
@@ -0,0 +1,130 @@
+"""In-process full-text index used when the database has no full-text search.
+
+MySQL (FULLTEXT) and SQLite (FTS5) search in the database itself; this
+index is the fallback for other backends and SQLite builds without FTS5.
+"""
+from collections import Counter
+import heapq
+import math
+import re
+import threading
+import time
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text or '')]
+
+
+class InvertedIndex:
+    """Term -> {doc_id: term frequency} postings ranked with BM25.
+
+    Callers record changed documents with mark_changed() and apply them by
+    re-reading those documents, holding refresh_lock, after take_changes().
+    The index starts out needing a full build.
+    """
+
+    def __init__(self, max_age=None, k1=1.2, b=0.75):
+        self.max_age = max_age
+        self.k1 = k1
+        self.b = b
+        self.refresh_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._doc_terms = {}
+        self._total_length = 0
+        self._changed = set()
+        self._rebuild = True
+        self._built_at = None
+        self.max_doc_id = 0
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def mark_changed(self, doc_ids=(), everything=False):
+        with self._lock:
+            self._changed.update(doc_ids)
+            self._rebuild = self._rebuild or everything
+            # New rows are picked up through max_doc_id, so mark even without ids
+            self._changed.add(None)
+
+    def take_changes(self):
+        """Pending (doc_ids, rebuild) since the last call, or None if up to date.
+
+        rebuild is also set once the last full build is older than max_age,
+        which bounds how stale writes made by other processes can get.
+        """
+        with self._lock:
+            expired = self.max_age is not None and self._built_at is not None and \
+                time.monotonic() - self._built_at > self.max_age
+            if not (self._changed or self._rebuild or expired):
+                return None
+            changes = ({doc_id for doc_id in self._changed if doc_id is not None},
+                       self._rebuild or expired)
+            self._changed = set()
+            self._rebuild = False
+            return changes
+
+    def clear(self):
+        with self._lock:
+            self._postings = {}
+            self._doc_terms = {}
+            self._total_length = 0
+            self.max_doc_id = 0
+            self._built_at = time.monotonic()
+
+    def add(self, doc_id, *texts):
+        counts = Counter(token for text in texts for token in tokenize(text))
+        with self._lock:
+            self._remove(doc_id)
+            for term, count in counts.items():
+                self._postings.setdefault(term, {})[doc_id] = count
+            self._doc_terms[doc_id] = (tuple(counts), sum(counts.values()))
+            self._total_length += sum(counts.values())
+            self.max_doc_id = max(self.max_doc_id, doc_id)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        entry = self._doc_terms.pop(doc_id, None)
+        if entry is None:
+            return
+        terms, length = entry
+        self._total_length -= length
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def search(self, query, limit, after=None):
+        """Up to limit (doc_id, score) pairs matching every query term, best first.
+
+        after=(score, doc_id) continues from the last pair of a previous page.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if not terms or any(p is None for p in postings):
+                return []
+            postings.sort(key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+            docs = len(self._doc_terms)
+            average_length = self._total_length / docs
+            weights = [math.log(1 + (docs - len(p) + 0.5) / (len(p) + 0.5))
+                       for p in postings]
+            ranked = []
+            for doc_id in candidates:
+                length = self._doc_terms[doc_id][1]
+                norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                score = sum(weight * p[doc_id] * (self.k1 + 1) / (p[doc_id] + norm)
+                            for weight, p in zip(weights, postings))
+                ranked.append((-score, doc_id))
+        if after is not None:
+            position = (-after[0], after[1])
+            ranked = [key for key in ranked if key > position]
+        return [(doc_id, -negative)
+                for negative, doc_id in heapq.nsmallest(limit, ranked)]
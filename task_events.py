@@ -0,0 +1,246 @@
+"""Server-Sent Events feed of task changes, served by async_api at /api/tasks/events.
+
+Triggers append every insert, update and delete on the task table to the
+task_event log (see TaskEvent in app.py), whichever process or API made the
+change. One EventBroker per process polls that log and fans new events out
+to every subscriber through its own bounded asyncio queue, so an idle
+connection costs a queue and a suspended coroutine rather than a thread.
+A client that reconnects with Last-Event-ID is replayed what it missed from
+the log; one whose ID is older than the log gets a reset event instead.
+
+Event ids are not handed out in commit order on MySQL, so the log is read
+with gap tracking rather than a plain `id > last` cursor. Delivery is at
+least once: replays re-send a few events the client may already have, and
+every event describes a task as it is now, so applying one twice is harmless.
+"""
+import asyncio
+import json
+import logging
+import time
+
+from sqlalchemy import func, or_, select
+
+from app import (TASK_FIELDS, Task, TaskCounter, TaskEvent, serialize_task_row,
+                 task_columns)
+
+logger = logging.getLogger(__name__)
+
+# Milliseconds browsers wait before reconnecting a dropped stream
+RETRY_MS = 2000
+
+
+def format_event(event_id, event_type, data):
+    """One SSE message"""
+    return (f'id: {event_id}\nevent: {event_type}\n'
+            f"data: {json.dumps(data, separators=(',', ':'))}\n\n")
+
+
+class EventBroker:
+    """Polls the task event log and fans new events out to subscribers.
+
+    Polling runs only while someone is subscribed. A subscriber whose queue
+    fills up is cut off rather than buffered without bound; its browser
+    reconnects with Last-Event-ID and catches up from the log.
+
+    MySQL allocates an auto-increment id when a row is inserted, not when
+    its transaction commits, so a poll can see event 12 while event 11 is
+    still uncommitted. Ids missing below the newest one published are kept
+    as gaps and read again on every poll until they turn up, or until
+    gap_timeout seconds pass (the transaction rolled back, or the id was
+    skipped). On resume, replay_window ids below Last-Event-ID are read
+    again for the same reason.
+    """
+
+    def __init__(self, session_factory, poll_interval=0.25, heartbeat=15.0,
+                 queue_size=1000, batch_limit=500, gap_timeout=10.0,
+                 replay_window=100):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.heartbeat = heartbeat
+        self.queue_size = queue_size
+        self.batch_limit = batch_limit
+        self.gap_timeout = gap_timeout
+        self.replay_window = replay_window
+        self.subscribers = set()
+        # Newest event id published, and missing ids below it with the time
+        # they were first missed
+        self.last_id = 0
+        self.gaps = {}
+        self._poller = None
+
+    async def latest_id(self, session):
+        return await session.scalar(select(func.max(TaskEvent.id))) or 0
+
+    async def read_rows(self, session, after_id, gap_ids=()):
+        """Log rows after after_id or among gap_ids, or None for too many"""
+        rows = (await session.execute(
+            select(TaskEvent.id, TaskEvent.task_id, TaskEvent.op)
+            .where(or_(TaskEvent.id > after_id, TaskEvent.id.in_(gap_ids)))
+            .order_by(TaskEvent.id).limit(self.batch_limit + 1))).all()
+        if len(rows) > self.batch_limit or any(row.op == 'reset' for row in rows):
+            return None
+        return rows
+
+    async def messages(self, session, rows):
+        """(event id, message) pairs for log rows.
+
+        Tasks are sent as they are now, so a burst of changes to one task
+        all describe its latest state. Creations, deletions and archivals
+        are followed by a total event with the task count.
+        """
+        task_ids = {row.task_id for row in rows
+                    if row.op not in ('deleted', 'archived')}
+        tasks = {}
+        if task_ids:
+            result = await session.execute(
+                select(*task_columns()).where(Task.id.in_(task_ids)))
+            tasks = {row['id']: serialize_task_row(row, TASK_FIELDS)
+                     for row in result.mappings()}
+        messages = []
+        for row in rows:
+            if row.op == 'archived':
+                messages.append((row.id, format_event(row.id, 'archived',
+                                                      {'id': row.task_id})))
+            elif row.task_id not in tasks:
+                # Deleted, perhaps after this event was logged
+                messages.append((row.id, format_event(row.id, 'deleted',
+                                                      {'id': row.task_id})))
+            else:
+                messages.append((row.id, format_event(row.id, row.op,
+                                                      tasks[row.task_id])))
+        if any(row.op in ('created', 'deleted', 'archived') for row in rows):
+            counters = dict((await session.execute(
+                select(TaskCounter.name, TaskCounter.value)
+                .where(TaskCounter.name.in_(['total', 'archived'])))).all())
+            if 'total' not in counters:
+                counters['total'] = await session.scalar(select(func.count(Task.id)))
+            totals = {'total': counters['total'],
+                      'archived': counters.get('archived', 0)}
+            messages.append((rows[-1].id, format_event(rows[-1].id, 'total',
+                                                       totals)))
+        return messages
+
+    async def reset(self, session):
+        newest = await self.latest_id(session)
+        return [(newest, format_event(newest, 'reset', {}))]
+
+    async def replay(self, session, after_id):
+        oldest = await session.scalar(select(func.min(TaskEvent.id)))
+        newest = await self.latest_id(session)
+        if after_id > newest or (oldest is not None and after_id < oldest - 1):
+            # Trimmed away, or an ID from another database
+            return await self.reset(session)
+        # Events just below after_id may have committed after the client saw it
+        rows = await self.read_rows(session, max(after_id - self.replay_window, 0))
+        if rows is None:
+            return await self.reset(session)
+        return await self.messages(session, rows)
+
+    def track_gaps(self, event_ids):
+        """Record newly read event ids: fill gaps, note new ones, expire old ones"""
+        now = time.monotonic()
+        for event_id in event_ids:
+            self.gaps.pop(event_id, None)
+        newest = max(event_ids, default=self.last_id)
+        if newest > self.last_id:
+            seen = set(event_ids)
+            missing = [event_id for event_id in range(self.last_id + 1, newest)
+                       if event_id not in seen]
+            # Keeps the IN list short after a large jump in ids
+            for event_id in missing[-self.batch_limit:]:
+                self.gaps[event_id] = now
+            self.last_id = newest
+        self.gaps = {event_id: since for event_id, since in self.gaps.items()
+                     if now - since < self.gap_timeout}
+
+    def disconnect(self, queue):
+        """Drop whatever is queued and end the subscriber's stream"""
+        self.subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def publish(self, messages):
+        for queue in list(self.subscribers):
+            try:
+                for message in messages:
+                    queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.disconnect(queue)
+
+    async def poll(self):
+        while self.subscribers:
+            try:
+                async with self.session_factory() as session:
+                    rows = await self.read_rows(session, self.last_id, list(self.gaps))
+                    if rows is None:
+                        messages = await self.reset(session)
+                        self.last_id = messages[0][0]
+                        self.gaps = {}
+                    else:
+                        messages = await self.messages(session, rows)
+                        self.track_gaps([row.id for row in rows])
+                    if messages:
+                        self.publish(messages)
+            except Exception:
+                logger.exception('Reading the task event log failed')
+            await asyncio.sleep(self.poll_interval)
+        self._poller = None
+
+    async def start_tracking(self, session):
+        """Start from the newest event, still waiting for recent missing ones"""
+        newest = await self.latest_id(session)
+        recent = await session.scalars(select(TaskEvent.id).where(
+            TaskEvent.id > newest - self.replay_window))
+        self.last_id = max(newest - self.replay_window, 0)
+        self.gaps = {}
+        self.track_gaps(list(recent))
+
+    async def subscribe(self, last_event_id=None):
+        """Register a subscriber queue; returns it with the messages to send first"""
+        queue = asyncio.Queue(self.queue_size)
+        async with self.session_factory() as session:
+            if self._poller is None:
+                await self.start_tracking(session)
+            # Registered before reading the backlog, so no event falls in between
+            self.subscribers.add(queue)
+            if last_event_id is None:
+                backlog = [(self.last_id, format_event(self.last_id, 'ready', {}))]
+            else:
+                backlog = await self.replay(session, last_event_id)
+        if self._poller is None:
+            self._poller = asyncio.get_running_loop().create_task(self.poll())
+        return queue, backlog
+
+    async def stream(self, last_event_id=None):
+        """SSE body for one client, starting after last_event_id if given"""
+        queue, backlog = await self.subscribe(last_event_id)
+        replayed = {event_id for event_id, _ in backlog}
+        try:
+            yield f'retry: {RETRY_MS}\n\n'
+            for event_id, message in backlog:
+                yield message
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle stream
+                    yield ': keep-alive\n\n'
+                    continue
+                if item is None:
+                    return
+                event_id, message = item
+                # The backlog may already have covered events queued meanwhile.
+                # Not by id order: a gap filled late has a lower id.
+                if event_id not in replayed:
+                    yield message
+        finally:
+            self.subscribers.discard(queue)
+
+    async def close(self):
+        """End every stream and stop polling"""
+        for queue in list(self.subscribers):
+            self.disconnect(queue)
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
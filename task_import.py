@@ -0,0 +1,181 @@
+"""Streaming CSV/NDJSON readers for `flask tasks import`.
+
+Records are validated into (title, description, completed, created_at)
+tuples and handed out in fixed-size batches, so memory use stays flat
+however large the input is.
+"""
+import csv
+from datetime import datetime, timezone
+import json
+from operator import itemgetter
+import os
+import queue
+import threading
+
+IMPORT_COLUMNS = ('title', 'description', 'completed', 'created_at')
+FORMATS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+COMPLETED_VALUES = {
+    **dict.fromkeys(('1', 'true', 't', 'yes', 'y', 'on'), True),
+    **dict.fromkeys(('0', 'false', 'f', 'no', 'n', 'off', ''), False),
+}
+
+
+class InvalidRecord(ValueError):
+    """A record that cannot be imported, with the input line it started on"""
+
+    def __init__(self, line, message):
+        super().__init__(f'line {line}: {message}')
+        self.line = line
+
+
+def detect_format(filename):
+    """csv or ndjson from a file extension, or None if it is not recognised"""
+    return FORMATS.get(os.path.splitext(filename or '')[1].lower())
+
+
+def read_csv(stream):
+    """Yield (line number, values in IMPORT_COLUMNS order) from CSV with a header row.
+
+    Missing columns and short rows read as empty strings.
+    """
+    reader = csv.reader(stream)
+    header = [name.strip() for name in next(reader, [])]
+    if 'title' not in header:
+        raise InvalidRecord(1, 'CSV header must include a title column')
+    width = len(header)
+    # Absent columns point one past the row, at the padding appended below
+    values = itemgetter(*[header.index(name) if name in header else width
+                          for name in IMPORT_COLUMNS])
+    line = reader.line_num
+    for row in reader:
+        if row:
+            if len(row) != width:
+                row = (row + [''] * width)[:width]
+            row.append('')
+            yield line + 1, values(row)
+        line = reader.line_num
+
+
+def read_ndjson(stream):
+    """Yield (line number, values in IMPORT_COLUMNS order), one JSON object a line"""
+    for line, text in enumerate(stream, 1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError as e:
+            raise InvalidRecord(line, f'invalid JSON ({e})') from None
+        if not isinstance(record, dict):
+            raise InvalidRecord(line, 'expected a JSON object')
+        yield line, (record.get('title'), record.get('description', ''),
+                     record.get('completed'), record.get('created_at'))
+
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson}
+
+
+def parse_completed(value):
+    if value is None or value is True or value is False:
+        return bool(value)
+    try:
+        return COMPLETED_VALUES[value.strip().lower()]
+    except (AttributeError, KeyError):
+        raise ValueError('completed must be true or false') from None
+
+
+def parse_created_at(value, default):
+    """Naive UTC datetime from an ISO 8601 string, as created_at is stored"""
+    if value is None or value == '':
+        return default
+    if not isinstance(value, str):
+        raise ValueError('created_at must be an ISO 8601 string')
+    value = value.strip()
+    # Z means UTC already; fromisoformat only accepts the suffix from Python 3.11
+    utc = value[-1:] in ('Z', 'z')
+    try:
+        parsed = datetime.fromisoformat(value[:-1] if utc else value)
+    except ValueError:
+        parsed = None
+    if parsed is None or (utc and parsed.tzinfo is not None):
+        raise ValueError(f'invalid created_at {value!r}')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def values_to_row(values, default_created_at, title_max_length):
+    title, description, completed, created_at = values
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError('title is required')
+    if len(title) > title_max_length:
+        raise ValueError(f'title must be at most {title_max_length} characters')
+    if description is not None and not isinstance(description, str):
+        raise ValueError('description must be a string')
+    return (title, description, parse_completed(completed),
+            parse_created_at(created_at, default_created_at))
+
+
+def read_batches(stream, fmt, batch_size, title_max_length, on_invalid=None):
+    """Yield lists of up to batch_size row tuples in IMPORT_COLUMNS order.
+
+    Invalid records raise InvalidRecord unless on_invalid is given, in which
+    case it is called with the error and the record is skipped. Rows without
+    a created_at get the time the import started.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    batch = []
+    for line, values in READERS[fmt](stream):
+        try:
+            batch.append(values_to_row(values, now, title_max_length))
+        except ValueError as e:
+            error = InvalidRecord(line, str(e))
+            if on_invalid is None:
+                raise error from None
+            on_invalid(error)
+            continue
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def prefetched(batches, depth=2):
+    """Iterate over batches produced by a background thread, up to depth ahead.
+
+    Parsing the next batch then overlaps with inserting the current one,
+    since database drivers release the GIL while the database works.
+    Exceptions from the producer are re-raised in the consumer.
+    """
+    ready = queue.Queue(depth)
+    done = object()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for batch in batches:
+                if stop.is_set():
+                    return
+                ready.put(batch)
+        except BaseException as e:
+            ready.put(e)
+        ready.put(done)
+
+    thread = threading.Thread(target=produce, name='import-reader', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = ready.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # Unblock a producer waiting on a full queue so it can see stop
+        while thread.is_alive():
+            try:
+                ready.get(timeout=0.1)
+            except queue.Empty:
+                pass
@@ -1,12 +1,25 @@
 import unittest
 import json
+import asyncio
 import os
+import subprocess
+import sys
 import tempfile
+import time
+from datetime import datetime
+from unittest import mock
 
 # Set environment variable to force SQLite before importing app
 os.environ['FORCE_SQLITE_TESTING'] = 'true'
 
+import app as app_module
 from app import app, db, Task
+from cache import MemoryCache, ReadThroughCache, RedisCache
+from database import InstrumentedQueuePool, PoolMetrics, build_engine_options
+from ratelimit import AdmissionController, MemoryTokenBuckets
+from write_buffer import CoalescingBuffer
+import json_provider
+from sqlalchemy import event, text
 
 
 class TaskManagerTestCase(unittest.TestCase):
@@ -24,6 +37,9 @@ class TaskManagerTestCase(unittest.TestCase):
         
         # Create test client
         self.app = app.test_client()
+        app.extensions['index_fragment_cache'].clear()
+        app.extensions['task_cache'].clear()
+        app.extensions['tasks_version'].invalidate()
         
         # Recreate all tables in the test database
         with app.app_context():
@@ -43,6 +59,520 @@ class TaskManagerTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(b'Task Manager', response.data)
     
+    def test_create_app_factory(self):
+        """Test the factory builds independent apps with config overrides"""
+        other = app_module.create_app({'TESTING': True, 'INDEX_PAGE_SIZE': 7})
+        self.assertIsNot(other, app)
+        self.assertEqual(other.config['INDEX_PAGE_SIZE'], 7)
+        self.assertIsNot(other.extensions['task_cache'], app.extensions['task_cache'])
+        self.assertIn('tasks.get_tasks', other.view_functions)
+
+    def test_task_reads_across_workers(self):
+        """Test a write through one worker reaches another worker's cached reads"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            uri = f"sqlite:///{os.path.join(tmpdir, 'workers.db')}"
+            first, second = (app_module.create_app({'SQLALCHEMY_DATABASE_URI': uri,
+                                                    'TASKS_VERSION_TTL': 0})
+                             for _ in range(2))
+            with first.app_context():
+                db.create_all()
+            writer, reader = first.test_client(), second.test_client()
+            response = writer.post('/api/tasks', json={'title': 'Before'})
+            task_id = response.get_json()['id']
+            etag = reader.get(f'/api/tasks/{task_id}').headers['ETag']
+            self.assertNotIn(b'Another', reader.get('/').data)
+
+            writer.post('/add', data={'title': 'Another'})
+            writer.patch('/api/tasks/bulk', json=[{'id': task_id, 'title': 'After'}])
+            self.assertIn(b'Another', reader.get('/').data)
+            self.assertEqual(len(reader.get('/api/tasks').get_json()), 2)
+            response = reader.get(f'/api/tasks/{task_id}',
+                                  headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()['title'], 'After')
+            for other in (first, second):
+                with other.app_context():
+                    for engine in app_module.app_engines():
+                        engine.dispose()
+
+    def test_import_does_no_network_io(self):
+        """Test importing the app resolves config without opening sockets"""
+        env = {k: v for k, v in os.environ.items()
+               if k not in ('FORCE_SQLITE_TESTING', 'DATABASE_URL')}
+        code = ('import socket\n'
+                'def refuse(*args):\n'
+                '    raise AssertionError("network I/O at import")\n'
+                'socket.socket.connect = refuse\n'
+                'import app\n'
+                'print(app.app.config["SQLALCHEMY_DATABASE_URI"])\n')
+        result = subprocess.run([sys.executable, '-c', code], env=env,
+                                capture_output=True, text=True, timeout=60,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), 'sqlite:///tasks.db')
+
+    def test_database_readiness_check(self):
+        """Test the sync, async and CLI readiness checks"""
+        self.assertEqual(app_module.check_database(), (True, None))
+        self.assertEqual(asyncio.run(app_module.check_database_async()), (True, None))
+
+        result = app.test_cli_runner().invoke(args=['wait-db', '--timeout', '0'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('Database is ready', result.output)
+
+        broken = app_module.create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:////nonexistent-dir/tasks.db'})
+        with broken.app_context():
+            ok, error = app_module.check_database()
+            self.assertFalse(ok)
+            self.assertIn('unable to open database file', error)
+            result = broken.test_cli_runner().invoke(args=['wait-db', '--timeout', '0'])
+            self.assertEqual(result.exit_code, 1)
+
+    def test_health_endpoints(self):
+        """Test /healthz skips the database and /readyz reuses a recent ping"""
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            response = self.app.get('/healthz')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json(), {'status': 'ok'})
+            self.assertEqual(statements, [])
+
+            first = self.app.get('/readyz')
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(first.get_json()['status'], 'ready')
+            self.assertIn('pool_class', first.get_json()['pool'])
+            self.assertEqual(statements, ['SELECT 1'])
+            # Within READINESS_CACHE_TTL the previous ping answers
+            self.assertEqual(self.app.get('/readyz').status_code, 200)
+            self.assertEqual(statements, ['SELECT 1'])
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+
+        broken = app_module.create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:////nonexistent-dir/tasks.db'})
+        response = broken.test_client().get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()['status'], 'unavailable')
+        self.assertIn('unable to open database file',
+                      response.get_json()['database']['error'])
+        self.assertEqual(broken.test_client().get('/healthz').status_code, 200)
+
+    def test_engine_pool_options(self):
+        """Test pool settings are passed to the engine, except for in-memory SQLite"""
+        config = dict(app.config,
+                      SQLALCHEMY_DATABASE_URI='mysql+pymysql://u:p@db/taskdb',
+                      DB_POOL_SIZE=3, DB_MAX_OVERFLOW=1, DB_POOL_RECYCLE=60)
+        options = build_engine_options(config)
+        self.assertEqual(options['pool_size'], 3)
+        self.assertEqual(options['max_overflow'], 1)
+        self.assertEqual(options['pool_recycle'], 60)
+        self.assertTrue(options['pool_pre_ping'])
+        self.assertIs(options['poolclass'], InstrumentedQueuePool)
+
+        config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.assertEqual(build_engine_options(config), {'pool_pre_ping': True})
+
+    def test_pool_stats_api(self):
+        """Test pool occupancy and checkout wait metrics are reported"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'pool.db')
+            other = app_module.create_app({
+                'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+                'DB_POOL_SIZE': 2,
+                'DB_MAX_OVERFLOW': 0,
+                'SQLITE_READ_WRITE_SPLIT': False,
+            })
+            with other.app_context():
+                db.create_all()
+                client = other.test_client()
+                client.get('/api/tasks')
+                stats = client.get('/api/pool/stats').get_json()
+                db.engine.dispose()
+
+        self.assertEqual(stats['pool_class'], 'InstrumentedQueuePool')
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['checked_out'], 1)
+        self.assertEqual(stats['saturation'], 0.5)
+        self.assertGreaterEqual(stats['checkouts'], 2)
+        self.assertIn('wait_seconds_p99', stats)
+
+    def test_sqlite_read_write_split(self):
+        """Test file SQLite gets WAL pragmas, read-only readers and a single writer"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'split.db')
+            other = app_module.create_app({
+                'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+                'CACHE_BACKEND': 'none',
+            })
+            with other.app_context():
+                db.create_all()
+                reader = other.extensions['read_engine']
+                statements = {'writer': [], 'reader': []}
+                for name, engine in (('writer', db.engine), ('reader', reader)):
+                    event.listen(engine, 'before_cursor_execute',
+                                 lambda conn, cursor, statement, *args, name=name:
+                                 statements[name].append(statement.split()[0]))
+                client = other.test_client()
+                response = client.post('/api/tasks', json={'title': 'Split'})
+                task_id = response.get_json()['id']
+                self.assertEqual(client.get(f'/api/tasks/{task_id}').status_code, 200)
+
+                with db.engine.connect() as connection:
+                    pragmas = {
+                        name: connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+                        for name in ('journal_mode', 'synchronous', 'busy_timeout')}
+                    # An open write transaction does not hold up readers
+                    connection.execute(text("UPDATE task SET title = 'Pending'"))
+                    started = time.perf_counter()
+                    response = client.get(f'/api/tasks/{task_id}?fields=id,title')
+                    read_seconds = time.perf_counter() - started
+                    connection.rollback()
+                with reader.connect() as connection:
+                    with self.assertRaises(Exception):
+                        connection.execute(text('DELETE FROM task'))
+                stats = client.get('/api/pool/stats').get_json()
+                db.session.remove()
+                # What gunicorn's post_fork disposes in each worker
+                engines = app_module.app_engines()
+                for engine in engines:
+                    engine.dispose()
+
+        self.assertEqual(pragmas, {'journal_mode': 'wal', 'synchronous': 1,
+                                   'busy_timeout': 5000})
+        self.assertIn('INSERT', statements['writer'])
+        self.assertEqual(statements['reader'][:1], ['SELECT'])
+        self.assertNotIn('INSERT', statements['reader'])
+        self.assertEqual(response.get_json()['title'], 'Split')
+        self.assertLess(read_seconds, 1)
+        self.assertEqual(stats['size'], 1)
+        self.assertEqual(stats['read']['size'], 10)
+        self.assertEqual(len(engines), 2)
+        self.assertIs(engines[1], reader)
+
+    def test_read_replica_routing(self):
+        """Test reads use a replica unless the client just wrote or the replica lags"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            primary_uri = f"sqlite:///{os.path.join(tmpdir, 'primary.db')}"
+            replica_path = os.path.join(tmpdir, 'replica.db')
+            setup = app_module.create_app({'SQLALCHEMY_DATABASE_URI': primary_uri})
+            with setup.app_context():
+                db.create_all()
+                db.session.add(Task(title='Synced'))
+                db.session.commit()
+                result = setup.test_cli_runner().invoke(args=['tasks', 'sync-replica',
+                                                              replica_path])
+                db.session.add(Task(title='Not replicated'))
+                db.session.commit()
+                db.session.remove()
+                db.engine.dispose()
+
+            other = app_module.create_app({
+                'SQLALCHEMY_DATABASE_URI': primary_uri,
+                'DATABASE_REPLICA_URLS': f'sqlite:///{replica_path}',
+                'REPLICA_MAX_LAG_SECONDS': 60,
+                'CACHE_BACKEND': 'none',
+            })
+            replicas = other.extensions['replicas']
+
+            def titles(client):
+                return [task['title'] for task in client.get('/api/tasks').get_json()]
+
+            # No enclosing app context: each request gets its own g, as in production
+            reader, writer = other.test_client(), other.test_client()
+            from_replica = titles(reader)
+            writer.post('/api/tasks', json={'title': 'Written'})
+            # The writer's cookie keeps it on the primary; other clients stay on the
+            # replica
+            sticky = titles(writer)
+            still_replica = titles(reader)
+            replicas.max_lag = 0
+            replicas.refresh()
+            lagging = titles(reader)
+            status = reader.get('/api/pool/stats').get_json()['replicas']
+            with other.app_context():
+                db.engine.dispose()
+            for engine in replicas.engines:
+                engine.dispose()
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(from_replica, ['Synced'])
+        self.assertEqual(sticky, ['Synced', 'Not replicated', 'Written'])
+        self.assertEqual(still_replica, ['Synced'])
+        self.assertEqual(lagging, ['Synced', 'Not replicated', 'Written'])
+        self.assertFalse(status['replicas'][0]['healthy'])
+        self.assertGreater(status['replicas'][0]['lag_seconds'], 0)
+        self.assertGreaterEqual(status['fallbacks'], 1)
+
+    def test_write_requests_read_primary(self):
+        """Test update, delete and bulk handlers never read from a lagging replica"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            primary_uri = f"sqlite:///{os.path.join(tmpdir, 'primary.db')}"
+            replica_path = os.path.join(tmpdir, 'replica.db')
+            setup = app_module.create_app({'SQLALCHEMY_DATABASE_URI': primary_uri})
+            with setup.app_context():
+                db.create_all()
+                synced = Task(title='Synced')
+                db.session.add(synced)
+                db.session.commit()
+                setup.test_cli_runner().invoke(args=['tasks', 'sync-replica',
+                                                     replica_path])
+                # Writes the replica has not caught up with
+                synced.title = 'Renamed on primary'
+                unsynced = [Task(title='Not replicated') for _ in range(2)]
+                db.session.add_all(unsynced)
+                db.session.commit()
+                ids = [synced.id] + [task.id for task in unsynced]
+                db.session.remove()
+                db.engine.dispose()
+
+            other = app_module.create_app({
+                'SQLALCHEMY_DATABASE_URI': primary_uri,
+                'DATABASE_REPLICA_URLS': f'sqlite:///{replica_path}',
+                'REPLICA_MAX_LAG_SECONDS': 60,
+                'CACHE_BACKEND': 'none',
+            })
+            # A fresh client each time, so no request is pinned by an earlier write
+            replica_read = other.test_client().get(f'/api/tasks/{ids[1]}')
+            # The replica still has 'Synced', so a diff against it would drop this
+            update = other.test_client().post(f'/update/{ids[0]}',
+                                              data={'title': 'Synced'})
+            delete = other.test_client().post(f'/delete/{ids[1]}')
+            bulk = other.test_client().patch('/api/tasks/bulk',
+                                             json=[{'id': ids[2], 'completed': True}])
+            with other.app_context():
+                # Locking reads go to the primary outside requests too
+                tasks = {task.id: task for task in Task.query.with_for_update()}
+                engines = app_module.app_engines()
+                db.session.remove()
+                for engine in engines:
+                    engine.dispose()
+
+        self.assertEqual(replica_read.status_code, 404)
+        self.assertEqual(update.status_code, 302)
+        self.assertEqual(tasks[ids[0]].title, 'Synced')
+        self.assertEqual(delete.status_code, 302)
+        self.assertNotIn(ids[1], tasks)
+        self.assertEqual(bulk.get_json()['summary'], {'updated': 1})
+        self.assertTrue(tasks[ids[2]].completed)
+        # post_fork disposes the primary, the SQLite read pool and the replica
+        self.assertEqual(len(engines), 3)
+
+    def test_rate_limit(self):
+        """Test each client gets its own write bucket and is refused with 429 past it"""
+        buckets = MemoryTokenBuckets(max_keys=2)
+        self.assertEqual(buckets.take('a', 1, 2, now=0), (True, 0.0))
+        self.assertEqual(buckets.take('a', 1, 2, now=0), (True, 0.0))
+        self.assertEqual(buckets.take('a', 1, 2, now=0.5), (False, 0.5))
+        self.assertTrue(buckets.take('a', 1, 2, now=1)[0])
+        buckets.take('b', 1, 2, now=1)
+        buckets.take('c', 1, 2, now=1)
+        self.assertEqual(buckets.stats()['clients'], 2)
+
+        other = app_module.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+                                       'RATE_LIMIT_BACKEND': 'memory',
+                                       'RATE_LIMIT_WRITE_RATE': 0.01,
+                                       'RATE_LIMIT_WRITE_BURST': 2,
+                                       'RATE_LIMIT_CLIENT_HEADER': 'X-Client-Id'})
+        with other.app_context():
+            db.create_all()
+            client = other.test_client()
+            abuser = {'X-Client-Id': 'abuser'}
+            statuses = [client.post('/api/tasks', json={'title': 'Spam'},
+                                    headers=abuser).status_code
+                        for _ in range(3)]
+            limited = client.post('/api/tasks', json={'title': 'Spam'}, headers=abuser)
+            polite = client.post('/api/tasks', json={'title': 'Polite'},
+                                 headers={'X-Client-Id': 'polite'})
+            read = client.get('/api/tasks', headers=abuser)
+            health = client.get('/healthz', headers=abuser)
+            stats = client.get('/api/limits/stats').get_json()
+            db.drop_all()
+
+        self.assertEqual(statuses, [201, 201, 429])
+        self.assertEqual(limited.status_code, 429)
+        self.assertEqual(limited.headers['Retry-After'], '100')
+        self.assertEqual(polite.status_code, 201)
+        self.assertEqual(read.status_code, 200)
+        self.assertEqual(health.status_code, 200)
+        self.assertEqual(stats['rate_limit']['limited'], {'read': 0, 'write': 2})
+
+    def test_rate_limit_behind_proxy(self):
+        """Test limiting is opt-in and keyed on the proxy's X-Forwarded-For entry"""
+        self.assertNotIn('rate_limiter', app.extensions)
+        other = app_module.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+                                       'RATE_LIMIT_BACKEND': 'memory',
+                                       'RATE_LIMIT_WRITE_RATE': 0.01,
+                                       'RATE_LIMIT_WRITE_BURST': 1,
+                                       'PROXY_FIX_X_FOR': 1})
+        with other.app_context():
+            db.create_all()
+            client = other.test_client()
+            proxy = {'REMOTE_ADDR': '10.0.0.2'}
+            # A client rotating a made-up first entry still has the proxy's entry last
+            spoofed = [client.post('/api/tasks', json={'title': 'Spam'},
+                                   environ_base=proxy,
+                                   headers={'X-Forwarded-For':
+                                            f'192.0.2.{i}, 203.0.113.7'}).status_code
+                       for i in range(3)]
+            other_client = client.post('/api/tasks', json={'title': 'Polite'},
+                                       environ_base=proxy,
+                                       headers={'X-Forwarded-For': '203.0.113.8'})
+            db.drop_all()
+
+        self.assertEqual(spoofed, [201, 429, 429])
+        self.assertEqual(other_client.status_code, 201)
+
+    def test_admission_control(self):
+        """Test requests are shed with 503 over the in flight or pool wait limits"""
+        other = app_module.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+                                       'ADMISSION_MAX_IN_FLIGHT': 1,
+                                       'ADMISSION_RETRY_AFTER': 2})
+        admission = other.extensions['admission']
+        with other.app_context():
+            db.create_all()
+            client = other.test_client()
+            self.assertEqual(client.get('/api/tasks').status_code, 200)
+            self.assertEqual(admission.in_flight, 0)
+            # Another request is still being served
+            admission.enter()
+            shed = client.get('/api/tasks')
+            ready = client.get('/readyz')
+            admission.leave()
+            after = client.get('/api/tasks')
+            db.drop_all()
+
+        self.assertEqual(shed.status_code, 503)
+        self.assertEqual(shed.headers['Retry-After'], '2')
+        self.assertEqual(ready.status_code, 200)
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(admission.stats()['shed'], {'in_flight': 1, 'pool_wait': 0})
+
+        metrics = PoolMetrics(half_life=0.05, weight=1.0)
+        metrics.record(0.8)
+        waiting = AdmissionController(max_pool_wait=0.5, pool_wait=metrics.recent_wait)
+        self.assertEqual(waiting.enter(), 'pool_wait')
+        # Once checkouts stop waiting the average decays and requests are admitted again
+        time.sleep(0.1)
+        self.assertIsNone(waiting.enter())
+
+    def test_metrics_endpoint(self):
+        """Test request latency, status and SQL counts are exposed for Prometheus"""
+        other = app_module.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+        with other.app_context():
+            db.create_all()
+            client = other.test_client()
+            client.post('/api/tasks', json={'title': 'Measured'})
+            client.get('/api/tasks/1')
+            client.get('/api/tasks/999')
+            client.get('/no/such/page')
+            response = client.get('/metrics')
+            db.drop_all()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        text = response.get_data(as_text=True)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        self.assertIn('http_requests_total{endpoint="tasks.get_task",method="GET",'
+                      'status="200"} 1', text)
+        self.assertIn('http_requests_total{endpoint="tasks.get_task",method="GET",'
+                      'status="404"} 1', text)
+        self.assertIn('http_requests_total{endpoint="unmatched",method="GET",'
+                      'status="404"} 1', text)
+        self.assertIn('http_request_duration_seconds_count'
+                      '{endpoint="tasks.create_task_api",method="POST"} 1', text)
+        # The first read after the write reloads the task version, then its row
+        self.assertIn('db_statements_per_request_bucket{endpoint="tasks.get_task",'
+                      'method="GET",le="1.0"} 1', text)
+        self.assertIn('db_statements_per_request_bucket{endpoint="tasks.get_task",'
+                      'method="GET",le="2.0"} 2', text)
+        # Only the /metrics request itself is still in flight
+        self.assertIn('http_requests_in_flight 1', text)
+
+        disabled = app_module.create_app({'METRICS_ENABLED': False})
+        self.assertEqual(disabled.test_client().get('/metrics').status_code, 404)
+
+    def test_slow_query_log(self):
+        """Test statements over SLOW_QUERY_MS are logged and counted"""
+        app.config['SLOW_QUERY_MS'] = 1e-6
+        try:
+            with self.assertLogs(app.logger, 'WARNING') as logs:
+                self.app.get('/api/tasks/1')
+        finally:
+            app.config['SLOW_QUERY_MS'] = 200
+        self.assertIn('Slow query', logs.output[0])
+        self.assertIn('tasks.get_task', logs.output[0])
+        self.assertIn('FROM task', logs.output[0])
+
+    def test_index_page_pagination(self):
+        """Test the index page renders one page of tasks at a time"""
+        for i in range(5):
+            db.session.add(Task(title=f'Paged Task {i}'))
+        db.session.commit()
+
+        # Newest first, so a task just added shows on the first page
+        response = self.app.get('/?per_page=2')
+        self.assertIn(b'Tasks (5)', response.data)
+        self.assertIn(b'Paged Task 3', response.data)
+        self.assertNotIn(b'Paged Task 2', response.data)
+        self.assertIn(b'Page 1 of 3', response.data)
+
+        response = self.app.get('/?per_page=2&page=3')
+        self.assertIn(b'Paged Task 0', response.data)
+        self.assertNotIn(b'Paged Task 3', response.data)
+
+        # Out-of-range pages show the last page
+        response = self.app.get('/?per_page=2&page=99')
+        self.assertIn(b'Page 3 of 3', response.data)
+
+    def test_index_page_fragment_cache(self):
+        """Test unchanged pages are served from cache until a write commits"""
+        db.session.add(Task(title='Cached Task'))
+        db.session.commit()
+
+        with mock.patch.object(app_module, 'render_task_list',
+                               wraps=app_module.render_task_list) as render:
+            self.app.get('/')
+            response = self.app.get('/')
+            self.assertIn(b'Cached Task', response.data)
+            self.assertEqual(render.call_count, 1)
+
+            self.app.post('/add', data={'title': 'Fresh Task'})
+            response = self.app.get('/')
+            self.assertIn(b'Fresh Task', response.data)
+            self.assertEqual(render.call_count, 2)
+
+            db.session.add(Task(title='Direct Task'))
+            db.session.commit()
+            response = self.app.get('/')
+            self.assertIn(b'Direct Task', response.data)
+            self.assertEqual(render.call_count, 3)
+
+            self.app.post('/api/tasks/bulk', json=[{'title': 'Bulk Task'}])
+            response = self.app.get('/')
+            self.assertIn(b'Bulk Task', response.data)
+            self.assertEqual(render.call_count, 4)
+
+    def test_index_page_cache_shared_version(self):
+        """Test pages follow the task_version row that every process bumps"""
+        self.app.post('/api/tasks/bulk', json=[{'title': 'One'}, {'title': 'Two'}])
+        self.assertEqual(app_module.load_tasks_version(), 1)
+
+        with mock.patch.object(app.extensions['tasks_version'], 'ttl', 0):
+            self.app.get('/')
+            # Another process's writes reach the table and the version row directly
+            with db.engine.begin() as conn:
+                conn.execute(app_module.insert(Task).values(title='Elsewhere'))
+            self.assertNotIn(b'Elsewhere', self.app.get('/').data)
+            with db.engine.begin() as conn:
+                conn.execute(app_module.update(app_module.TaskVersion)
+                             .values(value=app_module.TaskVersion.value + 1))
+            self.assertIn(b'Elsewhere', self.app.get('/').data)
+
     def test_add_task(self):
         """Test adding a new task"""
         response = self.app.post('/add', data={
@@ -134,6 +664,84 @@ class TaskManagerTestCase(unittest.TestCase):
         data = json.loads(response.data)
         self.assertFalse(data['completed'])
     
+    def test_toggle_task_single_update(self):
+        """Test toggling runs one atomic UPDATE without reading the row first"""
+        task = Task(title='Atomic Toggle', completed=None)
+        db.session.add(task)
+        db.session.commit()
+        task_id = task.id
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            response = self.app.post(f'/toggle/{task_id}')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+
+        self.assertTrue(response.get_json()['completed'])
+        # The only other statement bumps the shared task version
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[1].startswith('UPDATE task_version'))
+        self.assertTrue(statements[0].startswith('UPDATE task SET completed='))
+        self.assertIn('RETURNING', statements[0])
+        self.assertEqual(self.app.post('/toggle/999').status_code, 404)
+
+    def test_coalescing_buffer(self):
+        """Test repeated writes to a key are applied once per flush"""
+        batches = []
+
+        def apply(counts):
+            batches.append(counts)
+            return {key: count * 10 for key, count in counts.items()}
+        buffer = CoalescingBuffer(apply, interval=60)
+        futures = [buffer.submit(key) for key in (1, 1, 2, 1)]
+        buffer.flush()
+
+        self.assertEqual(batches, [{1: 3, 2: 1}])
+        self.assertEqual([f.result(timeout=1) for f in futures], [30, 30, 10, 30])
+        stats = buffer.stats()
+        self.assertEqual((stats['submitted'], stats['flushes'], stats['coalesced']),
+                         (4, 1, 2))
+
+    def test_toggle_write_behind_modes(self):
+        """Test grouped and deferred toggles coalesce into one flush"""
+        tasks = [Task(title='Odd'), Task(title='Even')]
+        db.session.add_all(tasks)
+        db.session.commit()
+        odd, even = (task.id for task in tasks)
+
+        self.assertEqual(app_module.apply_toggles({odd: 3, even: 2, 999: 1}),
+                         {odd: True, even: False})
+
+        for mode in ('group', 'deferred'):
+            other = app_module.create_app({
+                'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+                'TOGGLE_WRITE_MODE': mode,
+                'TOGGLE_FLUSH_INTERVAL': 0.01,
+            })
+            with other.app_context():
+                db.create_all()
+                db.session.add(Task(title='Buffered'))
+                db.session.commit()
+                response = other.test_client().post('/toggle/1')
+                buffer = other.extensions['toggle_buffer']
+                if mode == 'group':
+                    self.assertEqual(response.get_json(),
+                                     {'status': 'success', 'completed': True})
+                else:
+                    self.assertEqual(response.status_code, 202)
+                    self.assertEqual(response.get_json()['status'], 'queued')
+                    buffer.flush()
+                    db.session.expire_all()
+                self.assertTrue(db.session.get(Task, 1).completed)
+                db.drop_all()
+
+        with self.assertRaises(ValueError):
+            app_module.create_app({'TOGGLE_WRITE_MODE': 'sometimes'})
+
     def test_get_tasks_api(self):
         """Test API endpoint for getting all tasks"""
         # Create test tasks
@@ -203,6 +811,933 @@ class TaskManagerTestCase(unittest.TestCase):
         response = self.app.post('/toggle/999')
         self.assertEqual(response.status_code, 404)
 
+    def test_get_tasks_api_pagination(self):
+        """Test keyset pagination with limit and after cursor"""
+        for i in range(5):
+            db.session.add(Task(title=f'Task {i}'))
+        db.session.commit()
+
+        response = self.app.get('/api/tasks?limit=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t['title'] for t in response.get_json()],
+                         ['Task 0', 'Task 1'])
+        cursor = response.headers['X-Next-Cursor']
+        self.assertIn('rel="next"', response.headers['Link'])
+
+        seen = ['Task 0', 'Task 1']
+        while cursor:
+            response = self.app.get(f'/api/tasks?limit=2&after={cursor}')
+            seen.extend(t['title'] for t in response.get_json())
+            cursor = response.headers.get('X-Next-Cursor')
+        self.assertEqual(seen, [f'Task {i}' for i in range(5)])
+
+    def test_get_tasks_api_sort_by_created_at(self):
+        """Test keyset pagination ordered by creation time"""
+        db.session.add(Task(title='Newer', created_at=datetime(2024, 1, 2)))
+        db.session.add(Task(title='Older', created_at=datetime(2024, 1, 1)))
+        db.session.add(Task(title='Same time', created_at=datetime(2024, 1, 1)))
+        db.session.commit()
+
+        response = self.app.get('/api/tasks?sort=created_at&limit=2')
+        self.assertEqual([t['title'] for t in response.get_json()],
+                         ['Older', 'Same time'])
+        cursor = response.headers['X-Next-Cursor']
+
+        response = self.app.get(f'/api/tasks?sort=created_at&limit=2&after={cursor}')
+        self.assertEqual([t['title'] for t in response.get_json()], ['Newer'])
+        self.assertNotIn('X-Next-Cursor', response.headers)
+
+    def test_get_tasks_api_sort_by_created_at_with_nulls(self):
+        """Test created_at pages through rows without a creation time"""
+        for i in range(3):
+            db.session.add(Task(title=f'Undated {i}'))
+        db.session.add(Task(title='Dated', created_at=datetime(2024, 1, 1)))
+        db.session.commit()
+        Task.query.filter(Task.title.startswith('Undated')).update(
+            {'created_at': None})
+        db.session.commit()
+
+        seen = []
+        response = self.app.get('/api/tasks?sort=created_at&limit=2')
+        while True:
+            self.assertEqual(response.status_code, 200)
+            seen.extend(t['title'] for t in response.get_json())
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+            response = self.app.get(
+                f'/api/tasks?sort=created_at&limit=2&after={cursor}')
+        self.assertEqual(seen, ['Undated 0', 'Undated 1', 'Undated 2', 'Dated'])
+
+    def test_get_tasks_api_fields_and_filters(self):
+        """Test field projection and completed/created_at filters"""
+        db.session.add(Task(title='Open', created_at=datetime(2024, 1, 1)))
+        db.session.add(Task(title='Done', completed=True,
+                            created_at=datetime(2024, 2, 1)))
+        db.session.add(Task(title='Done early', completed=True,
+                            created_at=datetime(2023, 12, 1)))
+        db.session.commit()
+
+        response = self.app.get('/api/tasks?completed=true&fields=title'
+                                '&created_after=2024-01-01T00:00:00Z')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [{'title': 'Done'}])
+
+        response = self.app.get('/api/tasks?completed=false&fields=id,completed')
+        data = response.get_json()
+        self.assertEqual(len(data), 1)
+        self.assertEqual(set(data[0]), {'id', 'completed'})
+
+    def test_get_tasks_api_invalid_params(self):
+        """Test invalid list parameters return 400"""
+        for query in ('limit=abc', 'limit=0', 'sort=title', 'fields=secret',
+                      'completed=maybe', 'created_after=yesterday', 'after=garbage'):
+            response = self.app.get(f'/api/tasks?{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.get_json())
+
+    def explain_requests(self, url):
+        """Return the SQLite query plan of every SELECT a GET request runs"""
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            self.assertEqual(self.app.get(url).status_code, 200)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+
+        plans = []
+        with db.engine.connect() as conn:
+            for statement, parameters in statements:
+                rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement,
+                                            parameters)
+                plans.append([row[3] for row in rows])
+        return plans
+
+    def test_task_queries_use_indexes(self):
+        """Test filtered and sorted API queries are served by an index"""
+        for i in range(20):
+            db.session.add(Task(title=f'Task {i}', completed=i % 2 == 0,
+                                created_at=datetime(2024, 1, 1 + i)))
+        db.session.commit()
+        response = self.app.get('/api/tasks?sort=created_at&limit=2')
+        cursor = response.headers['X-Next-Cursor']
+
+        expected = {
+            '/api/tasks?completed=true&limit=2': 'ix_task_completed_id',
+            '/api/tasks?sort=created_at&limit=2': 'ix_task_created_at_id',
+            f'/api/tasks?sort=created_at&limit=2&after={cursor}':
+                'ix_task_created_at_id',
+            '/api/tasks?sort=created_at&completed=false':
+                'ix_task_completed_created_at',
+            '/api/tasks?sort=created_at&created_after=2024-01-10':
+                'ix_task_created_at_id',
+            '/api/tasks/export?completed=true': 'ix_task_completed_id',
+        }
+        for url, index_name in expected.items():
+            app.extensions['task_cache'].clear()
+            plans = self.explain_requests(url)
+            self.assertTrue(plans, url)
+            for plan in plans:
+                details = ' | '.join(plan)
+                self.assertIn(f'USING INDEX {index_name}', details, url)
+                self.assertNotIn('TEMP B-TREE', details, url)
+
+    def test_search_tasks_fts5(self):
+        """Test search is ranked, paginated and served by SQLite FTS5"""
+        db.session.add_all([
+            Task(title='Buy milk', description='Milk, oat milk and more milk'),
+            Task(title='Call the plumber', description='Kitchen sink leaks'),
+            Task(title='Milk the budget', description='Find savings'),
+            Task(title='Buy bread', description=None),
+        ])
+        db.session.commit()
+
+        response = self.app.get('/api/tasks/search?q=milk&limit=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(app.extensions['search_backend'], 'fts5')
+        first = response.get_json()
+        self.assertEqual([t['title'] for t in first], ['Buy milk'])
+        self.assertGreater(first[0]['score'], 0)
+
+        cursor = response.headers['X-Next-Cursor']
+        response = self.app.get(f'/api/tasks/search?q=milk&limit=1&after={cursor}')
+        self.assertEqual([t['title'] for t in response.get_json()], ['Milk the budget'])
+        self.assertNotIn('X-Next-Cursor', response.headers)
+
+        # Every term must match, case-insensitively; triggers keep the index current
+        response = self.app.get('/api/tasks/search?q=BUY+bread')
+        self.assertEqual([t['title'] for t in response.get_json()], ['Buy bread'])
+        self.app.post('/update/2', data={'title': 'Buy bread rolls', 'description': ''})
+        self.app.post('/delete/4')
+        response = self.app.get('/api/tasks/search?q=buy bread')
+        self.assertEqual([t['id'] for t in response.get_json()], [2])
+
+        for url in ('/api/tasks/search', '/api/tasks/search?q=+!',
+                    '/api/tasks/search?q=x&after=bad'):
+            self.assertEqual(self.app.get(url).status_code, 400)
+
+    def test_search_tasks_memory_index(self):
+        """Test the in-process index follows committed inserts, updates and deletes"""
+        other = app_module.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+                                       'SEARCH_BACKEND': 'memory',
+                                       'CACHE_BACKEND': 'none'})
+        with other.app_context():
+            db.create_all()
+            client = other.test_client()
+
+            def search(query):
+                response = client.get(f'/api/tasks/search?q={query}')
+                return [task['title'] for task in response.get_json()]
+
+            client.post('/api/tasks', json={'title': 'Water plants',
+                                            'description': 'Water the water lilies'})
+            client.post('/api/tasks', json={'title': 'Plants order'})
+            self.assertEqual(search('water'), ['Water plants'])
+            self.assertEqual(search('plants'), ['Plants order', 'Water plants'])
+
+            client.post('/api/tasks/bulk', json=[{'title': 'Repot plants'}])
+            client.patch('/api/tasks/bulk', json=[{'id': 2, 'title': 'Seed order'}])
+            client.post('/delete/1')
+            self.assertEqual(search('plants'), ['Repot plants'])
+            self.assertEqual(search('seed'), ['Seed order'])
+            self.assertEqual(search('water'), [])
+            self.assertEqual(len(other.extensions['search_index']), 2)
+            db.drop_all()
+
+    def test_task_stats_counters(self):
+        """Test stats come from counters kept current by every kind of write"""
+        self.app.post('/add', data={'title': 'Form task'})
+        self.app.post('/api/tasks', json={'title': 'API task'})
+        ids = [item['id'] for item in self.app.post('/api/tasks/bulk', json=[
+            {'title': f'Bulk {i}'} for i in range(4)]).get_json()['results']]
+        self.app.post(f'/toggle/{ids[0]}')
+        self.app.patch('/api/tasks/bulk', json=[{'id': ids[1], 'completed': True},
+                                                {'id': ids[2], 'completed': True}])
+        self.app.post(f'/delete/{ids[1]}')
+        self.app.delete('/api/tasks/bulk', json=[ids[3]])
+
+        stats = self.app.get('/api/tasks/stats').get_json()
+        today = datetime.utcnow().date().isoformat()
+        self.assertEqual(stats, {'total': 4, 'completed': 2, 'pending': 2,
+                                 'created_per_day': [{'date': today, 'created': 4}]})
+        self.assertEqual(app_module.live_task_totals(), {'total': 4, 'completed': 2})
+
+        # Stats reads the counters, not the task table
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            self.app.get('/api/tasks/stats?days=7')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+        self.assertFalse([sql for sql in statements if 'FROM task ' in sql + ' '])
+
+        self.assertEqual(self.app.get('/api/tasks/stats?days=0').status_code, 400)
+        self.assertEqual(self.app.get('/api/tasks/stats?days=x').status_code, 400)
+
+    def test_reconcile_task_stats(self):
+        """Test reconciliation rebuilds drifted counters from the task table"""
+        db.session.add_all([Task(title='One'), Task(title='Two', completed=True)])
+        db.session.commit()
+        db.session.execute(app_module.update(app_module.TaskCounter).values(value=99))
+        db.session.execute(app_module.delete(app_module.TaskDailyCount))
+        db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=['tasks', 'reconcile-stats'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('total 2 (was 99)', result.output)
+        stats = self.app.get('/api/tasks/stats').get_json()
+        self.assertEqual((stats['total'], stats['completed'], stats['pending']),
+                         (2, 1, 1))
+        self.assertEqual(stats['created_per_day'][0]['created'], 2)
+
+    def test_task_event_log(self):
+        """Test triggers log every kind of write for the events feed, and trimming"""
+        self.app.post('/add', data={'title': 'Form task'})
+        response = self.app.post('/api/tasks', json={'title': 'API task'})
+        task_id = response.get_json()['id']
+        self.app.post(f'/toggle/{task_id}')
+        self.app.post(f'/update/{task_id}',
+                      data={'title': 'API task', 'description': 'Edited'})
+        self.app.post(f'/delete/{task_id}')
+        log = db.session.execute(app_module.select(
+            app_module.TaskEvent.task_id, app_module.TaskEvent.op)
+            .order_by(app_module.TaskEvent.id)).all()
+        self.assertEqual([tuple(row) for row in log], [
+            (1, 'created'), (task_id, 'created'), (task_id, 'toggled'),
+            (task_id, 'updated'), (task_id, 'deleted')])
+
+        result = app.test_cli_runner().invoke(
+            args=['tasks', 'trim-events', '--keep', '2'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        ops = (app_module.select(app_module.TaskEvent.op)
+               .order_by(app_module.TaskEvent.id))
+        self.assertEqual(db.session.scalars(ops).all(), ['updated', 'deleted'])
+        # The newest row is the feed's latest id, so it is never trimmed
+        self.assertEqual(app_module.trim_task_events(db.session, 0), 1)
+        self.assertEqual(db.session.scalars(ops).all(), ['deleted'])
+
+        # Task writes trim the log themselves, here on every commit
+        app.config['EVENTS_LOG_SIZE'] = 2
+        try:
+            for title in ('One', 'Two', 'Three'):
+                self.app.post('/api/tasks', json={'title': title})
+        finally:
+            app.config['EVENTS_LOG_SIZE'] = 10000
+        self.assertEqual(db.session.scalars(ops).all(), ['created', 'created'])
+
+    def test_archive_completed_tasks(self):
+        """Test `flask tasks archive` moves old completed tasks in batches"""
+        old = datetime(2026, 1, 1)
+        db.session.add_all([
+            Task(title='Old done 1', completed=True, created_at=old),
+            Task(title='Old done 2', completed=True, created_at=old),
+            Task(title='Old done 3', completed=True, created_at=old),
+            Task(title='Old pending', completed=False, created_at=old),
+            Task(title='Recent done', completed=True),
+            # The newest task is never archived, even when it qualifies
+            Task(title='Old done newest', completed=True, created_at=old),
+        ])
+        db.session.commit()
+        stats = self.app.get('/api/tasks/stats?days=366').get_json()
+        app.config['ARCHIVE_BATCH_PAUSE'] = 0
+        try:
+            result = app.test_cli_runner().invoke(
+                args=['tasks', 'archive', '--older-than', '30', '--batch-size', '2'])
+        finally:
+            app.config['ARCHIVE_BATCH_PAUSE'] = 0.1
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('Archived 3 tasks', result.output)
+
+        self.assertEqual(sorted(task.title for task in Task.query.all()),
+                         ['Old done newest', 'Old pending', 'Recent done'])
+        archive = db.session.scalars(
+            app_module.select(app_module.TaskArchive.title)).all()
+        self.assertEqual(sorted(archive), ['Old done 1', 'Old done 2', 'Old done 3'])
+        # Stats still count archived tasks, and reconciling finds no drift
+        self.assertEqual(self.app.get('/api/tasks/stats?days=366').get_json(), stats)
+        app.test_cli_runner().invoke(args=['tasks', 'reconcile-stats'])
+        self.assertEqual(self.app.get('/api/tasks/stats?days=366').get_json(), stats)
+        self.assertEqual(app_module.task_totals(), {'total': 3, 'completed': 2})
+
+        ops = db.session.execute(app_module.select(
+            app_module.TaskEvent.task_id, app_module.TaskEvent.op)
+            .where(app_module.TaskEvent.op.in_(['deleted', 'archived']))).all()
+        self.assertEqual(sorted(tuple(row) for row in ops),
+                         [(1, 'archived'), (2, 'archived'), (3, 'archived')])
+
+    def test_include_archived_lists(self):
+        """Test lists read the hot table unless include_archived is given"""
+        old = datetime(2026, 1, 1)
+        db.session.add_all([
+            Task(title=f'Task {i}', completed=i in (2, 3), created_at=old)
+            for i in range(1, 5)])
+        db.session.commit()
+        archived = app_module.archive_completed_tasks(app_module.timedelta(days=1), 10)
+        self.assertEqual(archived, 2)
+
+        tasks = self.app.get('/api/tasks').get_json()
+        self.assertEqual([task['id'] for task in tasks], [1, 4])
+        response = self.app.get('/api/tasks?include_archived=true&limit=2')
+        self.assertEqual([task['id'] for task in response.get_json()], [1, 2])
+        response = self.app.get(f"/api/tasks?include_archived=true&limit=2"
+                                f"&after={response.headers['X-Next-Cursor']}")
+        self.assertEqual([task['id'] for task in response.get_json()], [3, 4])
+        response = self.app.get(
+            '/api/tasks?include_archived=true&completed=true&fields=title')
+        self.assertEqual(response.get_json(),
+                         [{'title': 'Task 2'}, {'title': 'Task 3'}])
+        response = self.app.get('/api/tasks/export?include_archived=true')
+        self.assertEqual(len(response.get_data(as_text=True).splitlines()), 4)
+        response = self.app.get('/api/tasks?include_archived=maybe')
+        self.assertEqual(response.status_code, 400)
+
+        self.assertIn(b'Tasks (2)', self.app.get('/').data)
+        page = self.app.get('/?include_archived=true').data
+        self.assertIn(b'Tasks (4)', page)
+        self.assertIn(b'Task 3', page)
+
+    def test_archived_ids_not_reused(self):
+        """Test deleting the newest task doesn't hand an archived id to the next one"""
+        old = datetime(2026, 1, 1)
+        db.session.add_all([Task(title=f'Task {i}', completed=i < 3, created_at=old)
+                            for i in range(1, 4)])
+        db.session.commit()
+        archived = app_module.archive_completed_tasks(app_module.timedelta(days=1), 10)
+        self.assertEqual(archived, 2)
+        self.app.post('/delete/3')
+
+        response = self.app.post('/api/tasks', json={'title': 'Task 4'})
+        self.assertEqual(response.get_json()['id'], 4)
+        tasks = self.app.get('/api/tasks?include_archived=true').get_json()
+        self.assertEqual([task['id'] for task in tasks], [1, 2, 4])
+        db.session.add(Task(title='Task 5'))
+        db.session.query(Task).filter_by(id=4).update(
+            {'completed': True, 'created_at': old})
+        db.session.commit()
+        archived = app_module.archive_completed_tasks(app_module.timedelta(days=1), 10)
+        self.assertEqual(archived, 1)
+
+    def test_import_tasks_csv(self):
+        """Test `flask tasks import` loads CSV in one transaction with search, stats"""
+        db.session.add(Task(title='Existing'))
+        db.session.commit()
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('title,completed,description,created_at\n'
+                    'Buy milk,true,"Oat milk, two cartons",2026-03-01T09:00:00Z\n'
+                    'Call plumber,no,,2026-03-01T23:30:00-02:00\n'
+                    '\n'
+                    'Pay rent,0,"Line one\nline two",\n')
+        self.addCleanup(os.remove, f.name)
+        version = app_module.load_tasks_version()
+
+        result = app.test_cli_runner().invoke(
+            args=['tasks', 'import', f.name, '--batch-size', '2'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('Imported 3 tasks', result.output)
+        self.assertGreater(app_module.load_tasks_version(), version)
+        tasks = {task.title: task for task in Task.query.all()}
+        self.assertEqual(len(tasks), 4)
+        self.assertTrue(tasks['Buy milk'].completed)
+        self.assertEqual(tasks['Buy milk'].description, 'Oat milk, two cartons')
+        self.assertEqual(tasks['Buy milk'].created_at, datetime(2026, 3, 1, 9))
+        self.assertEqual(tasks['Call plumber'].created_at, datetime(2026, 3, 2, 1, 30))
+        self.assertEqual(tasks['Call plumber'].description, '')
+        self.assertEqual(tasks['Pay rent'].description, 'Line one\nline two')
+
+        # The bulk-applied triggers and deferred indexes are back afterwards
+        names = set(db.session.execute(text(
+            "SELECT name FROM sqlite_master WHERE type IN ('trigger', 'index')"))
+            .scalars())
+        self.assertLessEqual(
+            {'task_fts_insert', 'task_stats_insert', 'ix_task_created_at_id'}, names)
+        search = self.app.get('/api/tasks/search?q=milk').get_json()
+        self.assertEqual([task['title'] for task in search], ['Buy milk'])
+        self.assertEqual(app_module.task_totals(), app_module.live_task_totals())
+        daily = app_module.TaskDailyCount
+        days = {day.isoformat(): count for day, count in db.session.execute(
+            app_module.select(daily.day, daily.created))}
+        self.assertEqual(days['2026-03-01'], 1)
+        self.assertEqual(days['2026-03-02'], 1)
+
+    def test_import_tasks_invalid_records(self):
+        """Test an invalid record aborts the whole SQLite import unless skipped"""
+        records = [{'title': 'First'}, {'title': 'Second', 'completed': True},
+                   {'title': ''}, {'title': 'Third', 'created_at': 'tomorrow'}]
+        data = '\n'.join(json.dumps(record) for record in records) + '\n'
+        runner = app.test_cli_runner()
+
+        result = runner.invoke(args=['tasks', 'import', '--format', 'ndjson',
+                                     '--batch-size', '1'], input=data)
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('line 3: title is required', result.output)
+        self.assertEqual(Task.query.count(), 0)
+
+        result = runner.invoke(args=['tasks', 'import', '--format', 'ndjson',
+                                     '--skip-invalid'], input=data)
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Skipping line 4: invalid created_at 'tomorrow'", result.output)
+        self.assertIn('Imported 2 tasks', result.output)
+        self.assertEqual(app_module.task_totals(), {'total': 2, 'completed': 1})
+
+        result = runner.invoke(args=['tasks', 'import'], input=data)
+        self.assertEqual(result.exit_code, 2)
+        result = runner.invoke(args=['tasks', 'import', '--format', 'csv',
+                                     '--method', 'load-data'], input='title\nx\n')
+        self.assertEqual(result.exit_code, 2)
+
+    @unittest.skipIf(json_provider.orjson is None, 'orjson not installed')
+    def test_orjson_provider_byte_compatible(self):
+        """Test the orjson provider writes exactly what the stdlib provider writes"""
+        import decimal
+        import uuid
+        from flask.json.provider import DefaultJSONProvider
+        fast, stdlib = json_provider.OrjsonProvider(app), DefaultJSONProvider(app)
+        samples = [
+            [{'id': 1, 'title': 'Plain', 'description': None, 'completed': False,
+              'created_at': '2026-10-17T09:30:00.123456'}],
+            {'text': ''.join(chr(i) for i in range(128)),
+             'unicode': 'caf\u00e9 \u2603 \U0001f600'},
+            {'floats': [0.1, 1e-05, 4.2e-05, 1e-4, 1e16, 1.5e300, 2.5, -0.0, 1234.5678],
+             'ints': [0, -1, 2 ** 63 - 1]},
+            {'big': 2 ** 70, 'nested': {'b': [1, {'d': None, 'c': True}], 'a': []}},
+            {'when': datetime(2026, 10, 17, 9, 30), 'amount': decimal.Decimal('1.50'),
+             'uuid': uuid.UUID(int=7), 'markup': app_module.Markup('<b>x</b>')},
+            {2: 'int key', 1: 'sorted numerically'},
+            'v1.2 release', 123, None,
+        ]
+        for sample in samples:
+            self.assertEqual(fast.dumps(sample, separators=(',', ':')),
+                             stdlib.dumps(sample, separators=(',', ':')))
+            self.assertEqual(fast.dumps(sample), stdlib.dumps(sample))
+
+        self.assertIsInstance(app.json, json_provider.OrjsonProvider)
+        db.session.add_all([Task(title=f'T\u00e2che {i}' if i % 2 else f'Task {i}',
+                                 description='x\x7fy' if i % 3 else None)
+                            for i in range(20)])
+        db.session.commit()
+        fast_body = self.app.get('/api/tasks?limit=50').data
+        app.json = stdlib
+        try:
+            app.extensions['task_cache'].clear()
+            self.assertEqual(self.app.get('/api/tasks?limit=50').data, fast_body)
+        finally:
+            app.json = fast
+
+    def test_export_tasks_ndjson(self):
+        """Test streaming NDJSON export returns every task across batches"""
+        app.config['TASKS_EXPORT_BATCH_SIZE'] = 2
+        for i in range(5):
+            db.session.add(Task(title=f'Task {i}', completed=i % 2 == 0))
+        db.session.commit()
+
+        response = self.app.get('/api/tasks/export?format=ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertTrue(response.is_streamed)
+
+        rows = [json.loads(line) for line in response.data.decode().splitlines()]
+        self.assertEqual([row['title'] for row in rows],
+                         [f'Task {i}' for i in range(5)])
+
+        response = self.app.get('/api/tasks/export?completed=false&fields=title')
+        rows = [json.loads(line) for line in response.data.decode().splitlines()]
+        self.assertEqual(rows, [{'title': 'Task 1'}, {'title': 'Task 3'}])
+
+    def test_export_tasks_json(self):
+        """Test streaming JSON export matches the list API output"""
+        app.config['TASKS_EXPORT_BATCH_SIZE'] = 2
+        for i in range(5):
+            db.session.add(Task(title=f'Task {i}', description=f'Description {i}'))
+        db.session.commit()
+
+        response = self.app.get('/api/tasks/export?format=json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), self.app.get('/api/tasks').get_json())
+
+        response = self.app.get('/api/tasks/export?format=csv')
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_tasks_empty(self):
+        """Test export of an empty table"""
+        self.assertEqual(self.app.get('/api/tasks/export?format=json').get_json(), [])
+        self.assertEqual(self.app.get('/api/tasks/export').data, b'')
+
+    def test_get_task_api(self):
+        """Test the single-task endpoint and its 404"""
+        task = Task(title='Single', description='One task')
+        db.session.add(task)
+        db.session.commit()
+
+        response = self.app.get(f'/api/tasks/{task.id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), task.to_dict())
+        response = self.app.get('/api/tasks/999')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json(), {'error': 'Task not found'})
+
+    def test_task_read_cache_etag(self):
+        """Test cached reads honour If-None-Match and are invalidated by writes"""
+        task = Task(title='Etag Task')
+        db.session.add(task)
+        db.session.commit()
+
+        for url in ('/api/tasks', f'/api/tasks/{task.id}'):
+            response = self.app.get(url)
+            etag = response.headers['ETag']
+            response = self.app.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.data, b'')
+
+            self.app.post(f'/toggle/{task.id}')
+            response = self.app.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_task_read_cache_invalidation(self):
+        """Test a committed write moves every cached read to a new version"""
+        first, second = Task(title='First'), Task(title='Second')
+        db.session.add_all([first, second])
+        db.session.commit()
+
+        def counters():
+            stats = self.app.get('/api/cache/stats').get_json()
+            return stats['hits'], stats['misses']
+
+        hits, misses = counters()
+        self.app.get('/api/tasks')
+        self.app.get(f'/api/tasks/{first.id}')
+        self.app.get(f'/api/tasks/{second.id}')
+        self.assertEqual(counters(), (hits, misses + 3))
+
+        self.app.patch('/api/tasks/bulk',
+                       json=[{'id': first.id, 'title': 'First renamed'}])
+        self.assertEqual(self.app.get(f'/api/tasks/{first.id}').get_json()['title'],
+                         'First renamed')
+        self.app.get(f'/api/tasks/{second.id}')
+        self.assertEqual(self.app.get('/api/tasks').get_json()[0]['title'],
+                         'First renamed')
+        self.assertEqual(counters(), (hits, misses + 6))
+        self.app.get(f'/api/tasks/{second.id}')
+        self.assertEqual(counters(), (hits + 1, misses + 6))
+
+        second_id = second.id
+        self.app.delete('/api/tasks/bulk', json=[second_id])
+        self.assertEqual(self.app.get(f'/api/tasks/{second_id}').status_code, 404)
+
+    def test_task_read_cache_shared_version(self):
+        """Test cached reads follow the task_version row that every process bumps"""
+        task = Task(title='Before')
+        db.session.add(task)
+        db.session.commit()
+        url = f'/api/tasks/{task.id}'
+
+        with mock.patch.object(app.extensions['tasks_version'], 'ttl', 0):
+            etag = self.app.get(url).headers['ETag']
+            self.app.get('/api/tasks')
+            # Another process commits the change and the version bump together
+            with db.engine.begin() as conn:
+                conn.execute(app_module.update(Task).values(title='After'))
+                conn.execute(app_module.update(app_module.TaskVersion)
+                             .values(value=app_module.TaskVersion.value + 1))
+            # Requests here share the test's session; forget the rows it loaded
+            db.session.expire_all()
+            response = self.app.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()['title'], 'After')
+            self.assertEqual(self.app.get('/api/tasks').get_json()[0]['title'], 'After')
+
+    def test_task_read_cache_backend_failure(self):
+        """Test reads fall through to the database while the cache backend fails"""
+        class BrokenRedis:
+            def __getattr__(self, name):
+                def fail(*args, **kwargs):
+                    raise ConnectionError('cache down')
+                return fail
+
+        db.session.add(Task(title='Uncached'))
+        db.session.commit()
+        broken = ReadThroughCache(RedisCache(BrokenRedis()))
+        with mock.patch.dict(app.extensions, {'task_cache': broken}):
+            for url in ('/api/tasks', '/api/tasks/1', '/api/cache/stats'):
+                self.assertEqual(self.app.get(url).status_code, 200, url)
+            self.assertEqual(self.app.post('/api/tasks',
+                                           json={'title': 'Write'}).status_code, 201)
+            broken.clear()
+        self.assertGreater(broken.stats()['errors'], 0)
+
+    def test_memory_cache_bounds(self):
+        """Test the in-process cache evicts least recently used and expired entries"""
+        backend = MemoryCache(max_entries=2)
+        backend.set('a', b'1')
+        backend.set('b', b'2')
+        backend.get('a')
+        backend.set('c', b'3')
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.get('a'), b'1')
+        self.assertEqual(backend.stats()['evictions'], 1)
+
+        backend.set('d', b'4', ttl=0.001)
+        with mock.patch('cache.time.monotonic', return_value=time.monotonic() + 1):
+            self.assertIsNone(backend.get('d'))
+        self.assertEqual(backend.stats()['expirations'], 1)
+
+    def test_redis_cache_backend(self):
+        """Test the Redis-compatible backend against a minimal client"""
+        class FakeRedis:
+            def __init__(self):
+                self.data = {}
+
+            def get(self, key):
+                return self.data.get(key)
+
+            def set(self, key, value, ex=None):
+                self.data[key] = value
+
+            def delete(self, *keys):
+                for key in keys:
+                    self.data.pop(key, None)
+
+            def scan_iter(self, match):
+                return [key for key in self.data if key.startswith(match.rstrip('*'))]
+
+        client = FakeRedis()
+        cache = ReadThroughCache(RedisCache(client, prefix='test:'))
+        cache.set('key', {'body': '[]'})
+        self.assertEqual(cache.get('key'), {'body': '[]'})
+        self.assertIn('test:key', client.data)
+        cache.delete('key')
+        self.assertIsNone(cache.get('key'))
+        cache.set('other', {'body': '{}'})
+        cache.clear()
+        self.assertEqual(client.data, {})
+
+    def test_bulk_create_tasks(self):
+        """Test bulk creation across several transactions with per-item results"""
+        app.config['BULK_CHUNK_SIZE'] = 2
+        items = [
+            {'title': 'Bulk 1', 'description': 'First'},
+            {'title': ''},
+            {'title': 'Bulk 2', 'completed': True},
+            'not an object',
+            {'title': 'Bulk 3'},
+        ]
+        response = self.app.post('/api/tasks/bulk', json=items)
+        self.assertEqual(response.status_code, 200)
+
+        data = response.get_json()
+        self.assertEqual(data['summary'], {'created': 3, 'error': 2})
+        self.assertEqual([r['status'] for r in data['results']],
+                         ['created', 'error', 'created', 'error', 'created'])
+        self.assertEqual([r['index'] for r in data['results']], list(range(5)))
+
+        created = Task.query.get(data['results'][2]['id'])
+        self.assertEqual(created.title, 'Bulk 2')
+        self.assertTrue(created.completed)
+        self.assertEqual(Task.query.count(), 3)
+
+    def test_bulk_update_tasks(self):
+        """Test bulk updates grouped by identical values and by primary key"""
+        tasks = [Task(title=f'Task {i}') for i in range(4)]
+        db.session.add_all(tasks)
+        db.session.commit()
+        ids = [task.id for task in tasks]
+
+        response = self.app.patch('/api/tasks/bulk', json=[
+            {'id': ids[0], 'completed': True},
+            {'id': ids[1], 'completed': True},
+            {'id': ids[2], 'title': 'Renamed 2'},
+            {'id': ids[3], 'title': 'Renamed 3', 'description': 'New'},
+            {'id': 999, 'completed': True},
+            {'id': ids[0]},
+        ])
+        data = response.get_json()
+        self.assertEqual(data['summary'], {'updated': 4, 'not_found': 1, 'error': 1})
+
+        db.session.expire_all()
+        self.assertTrue(Task.query.get(ids[0]).completed)
+        self.assertTrue(Task.query.get(ids[1]).completed)
+        self.assertEqual(Task.query.get(ids[2]).title, 'Renamed 2')
+        self.assertFalse(Task.query.get(ids[2]).completed)
+        self.assertEqual(Task.query.get(ids[3]).description, 'New')
+
+    def test_bulk_delete_tasks(self):
+        """Test bulk deletion reports missing ids"""
+        tasks = [Task(title=f'Task {i}') for i in range(3)]
+        db.session.add_all(tasks)
+        db.session.commit()
+        ids = [task.id for task in tasks]
+
+        response = self.app.delete('/api/tasks/bulk',
+                                   json=[ids[0], {'id': ids[2]}, 999, 'x'])
+        data = response.get_json()
+        self.assertEqual([r['status'] for r in data['results']],
+                         ['deleted', 'deleted', 'not_found', 'error'])
+        self.assertEqual([t.id for t in Task.query.all()], [ids[1]])
+
+    def test_bulk_invalid_body(self):
+        """Test bulk endpoints reject non-array bodies and oversized requests"""
+        response = self.app.post('/api/tasks/bulk', json={'title': 'Not a list'})
+        self.assertEqual(response.status_code, 400)
+
+        app.config['BULK_MAX_ITEMS'] = 2
+        try:
+            response = self.app.delete('/api/tasks/bulk', json=[1, 2, 3])
+            self.assertEqual(response.status_code, 413)
+        finally:
+            app.config['BULK_MAX_ITEMS'] = 50000
+
+
+try:
+    import async_api
+except ImportError:  # quart / aiosqlite not installed
+    async_api = None
+
+
+@unittest.skipIf(async_api is None, 'async API dependencies not installed')
+class AsyncTaskApiTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        """Serve the async app against a temporary SQLite file"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        uri = f"sqlite:///{os.path.join(self.tmpdir.name, 'tasks.db')}"
+        self.app = async_api.create_async_app({'SQLALCHEMY_DATABASE_URI': uri,
+                                               'TESTING': True,
+                                               'EVENTS_POLL_INTERVAL': 0.01})
+        self.serving = self.app.test_app()
+        await self.serving.__aenter__()
+        async with self.app.extensions['async_engine'].begin() as conn:
+            await conn.run_sync(Task.metadata.create_all)
+        self.client = self.app.test_client()
+
+    async def asyncTearDown(self):
+        await self.serving.__aexit__(None, None, None)
+        self.tmpdir.cleanup()
+
+    def test_async_database_uri(self):
+        """Test sync URIs map onto async drivers"""
+        uri = async_api.async_database_uri
+        self.assertEqual(uri('mysql+pymysql://u:p@db/tasks', '/i'),
+                         'mysql+aiomysql://u:p@db/tasks')
+        self.assertEqual(uri('sqlite:///tasks.db', '/inst'),
+                         'sqlite+aiosqlite:////inst/tasks.db')
+        self.assertEqual(uri('sqlite:////abs/tasks.db', '/inst'),
+                         'sqlite+aiosqlite:////abs/tasks.db')
+
+    async def test_async_task_crud(self):
+        """Test create, read, update, toggle and delete through /api/v2/tasks"""
+        response = await self.client.post('/api/v2/tasks', json={'title': 'Async task'})
+        self.assertEqual(response.status_code, 201)
+        created = await response.get_json()
+        self.assertEqual(created['title'], 'Async task')
+        self.assertFalse(created['completed'])
+        task_url = f"/api/v2/tasks/{created['id']}"
+
+        response = await self.client.get(task_url)
+        self.assertEqual((await response.get_json())['title'], 'Async task')
+
+        response = await self.client.patch(task_url, json={'description': 'Updated'})
+        self.assertEqual((await response.get_json())['description'], 'Updated')
+
+        response = await self.client.post(f'{task_url}/toggle')
+        self.assertEqual(await response.get_json(),
+                         {'status': 'success', 'completed': True})
+
+        response = await self.client.delete(task_url)
+        self.assertEqual(response.status_code, 200)
+        response = await self.client.get(task_url)
+        self.assertEqual(response.status_code, 404)
+
+        # Each write bumped the version that keys the Flask app's cached reads
+        async with self.app.extensions['async_engine'].connect() as conn:
+            version = await conn.scalar(app_module.select(app_module.TaskVersion.value))
+        self.assertEqual(version, 4)
+
+    async def test_async_task_list_pagination(self):
+        """Test the async list shares the v1 filters and keyset cursors"""
+        for i in range(5):
+            await self.client.post('/api/v2/tasks', json={'title': f'Task {i}',
+                                                          'completed': i % 2 == 0})
+
+        response = await self.client.get('/api/v2/tasks?limit=2')
+        first = await response.get_json()
+        self.assertEqual([t['title'] for t in first], ['Task 0', 'Task 1'])
+        cursor = response.headers['X-Next-Cursor']
+        self.assertIn('/api/v2/tasks?', response.headers['Link'])
+
+        response = await self.client.get(f'/api/v2/tasks?limit=2&after={cursor}')
+        self.assertEqual([t['title'] for t in await response.get_json()],
+                         ['Task 2', 'Task 3'])
+
+        response = await self.client.get('/api/v2/tasks?completed=true&fields=title')
+        self.assertEqual(await response.get_json(), [
+            {'title': 'Task 0'}, {'title': 'Task 2'}, {'title': 'Task 4'}])
+
+    async def test_async_healthz(self):
+        """Test the async server's liveness endpoint"""
+        response = await self.client.get('/healthz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(await response.get_json(), {'status': 'ok'})
+
+    async def test_async_task_validation(self):
+        """Test the async API rejects invalid bodies and parameters"""
+        response = await self.client.post('/api/v2/tasks',
+                                          json={'description': 'No title'})
+        self.assertEqual(response.status_code, 400)
+        response = await self.client.patch('/api/v2/tasks/1', json={})
+        self.assertEqual(response.status_code, 400)
+        response = await self.client.get('/api/v2/tasks?limit=abc')
+        self.assertEqual(response.status_code, 400)
+
+    async def read_sse(self, connection, count, skip=('total',)):
+        """The next count events from an SSE connection, as (id, type, data)"""
+        events, buffer = [], ''
+        while len(events) < count:
+            buffer += (await asyncio.wait_for(connection.receive(), 5)).decode()
+            *messages, buffer = buffer.split('\n\n')
+            for message in messages:
+                fields = dict(line.split(': ', 1) for line in message.split('\n')
+                              if ': ' in line and not line.startswith(':'))
+                if 'event' in fields and fields['event'] not in skip:
+                    events.append((int(fields['id']), fields['event'],
+                                   json.loads(fields['data'])))
+        return events
+
+    async def test_task_event_stream(self):
+        """Test /api/tasks/events streams changes and replays from Last-Event-ID"""
+        async with self.client.request('/api/tasks/events') as connection:
+            await connection.send_complete()
+            [(ready_id, kind, _)] = await self.read_sse(connection, 1)
+            self.assertEqual(kind, 'ready')
+
+            response = await self.client.post('/api/v2/tasks', json={'title': 'Live'})
+            task_id = (await response.get_json())['id']
+            await self.client.post(f'/api/v2/tasks/{task_id}/toggle')
+            events = await self.read_sse(connection, 3, skip=())
+            await connection.disconnect()
+        # The total follows the poll batch holding the creation, which may also
+        # hold the toggle
+        totals = [data for _, kind, data in events if kind == 'total']
+        self.assertEqual(totals, [{'total': 1, 'archived': 0}])
+        events = [event for event in events if event[1] != 'total']
+        self.assertEqual([kind for _, kind, _ in events], ['created', 'toggled'])
+        self.assertEqual(events[1][2]['title'], 'Live')
+        self.assertTrue(events[1][2]['completed'])
+
+        # Reconnecting after the first event replays what came after it, as tasks are
+        # now, and re-sends the events just below it in case one committed late
+        await self.client.patch(f'/api/v2/tasks/{task_id}',
+                                json={'description': 'Missed'})
+        resume = {'Last-Event-ID': str(events[0][0])}
+        async with self.client.request('/api/tasks/events',
+                                       headers=resume) as connection:
+            await connection.send_complete()
+            replayed = await self.read_sse(connection, 3)
+            await connection.disconnect()
+        self.assertEqual([kind for _, kind, _ in replayed[1:]], ['toggled', 'updated'])
+        self.assertEqual(replayed[0][:2], events[0][:2])
+        self.assertEqual(replayed[1][2]['description'], 'Missed')
+
+        response = await self.client.get('/api/tasks/events?last_event_id=abc')
+        self.assertEqual(response.status_code, 400)
+
+    async def test_task_event_stream_late_commit(self):
+        """Test an event committed after a higher id is still streamed and replayed"""
+        async def log_event(event_id, task_id):
+            async with self.app.extensions['async_session']() as session:
+                session.add(app_module.TaskEvent(id=event_id, task_id=task_id,
+                                                 op='deleted'))
+                await session.commit()
+
+        async with self.client.request('/api/tasks/events') as connection:
+            await connection.send_complete()
+            [(ready_id, _, _)] = await self.read_sse(connection, 1)
+            # As on MySQL, where ids are taken at insert and commit out of order
+            await log_event(ready_id + 2, 2)
+            events = await self.read_sse(connection, 1)
+            await log_event(ready_id + 1, 1)
+            events += await self.read_sse(connection, 1)
+            await connection.disconnect()
+        self.assertEqual([(event_id, data) for event_id, _, data in events],
+                         [(ready_id + 2, {'id': 2}), (ready_id + 1, {'id': 1})])
+
+        # A client that saw the higher id before the lower one committed gets it
+        resume = {'Last-Event-ID': str(ready_id + 2)}
+        async with self.client.request('/api/tasks/events',
+                                       headers=resume) as connection:
+            await connection.send_complete()
+            replayed = await self.read_sse(connection, 2)
+            await connection.disconnect()
+        self.assertEqual([event_id for event_id, _, _ in replayed],
+                         [ready_id + 1, ready_id + 2])
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file